@@ -1,4 +1,4 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -14,6 +14,10 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # orjson-backed JSON responses when available
+    from app.services.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
@@ -21,8 +25,8 @@ def create_app():
     login_manager.init_app(app)
     
     # Create upload directory if it doesn't exist
-    upload_dir = os.path.join(app.instance_path, '..', 'static', 'uploads')
-    os.makedirs(upload_dir, exist_ok=True)
+    app.config.setdefault('UPLOAD_DIR', os.path.abspath(os.path.join(app.instance_path, '..', 'static', 'uploads')))
+    os.makedirs(app.config['UPLOAD_DIR'], exist_ok=True)
     
     # Register blueprints
     from app.routes.auth import bp as auth_bp
@@ -33,18 +37,47 @@ def create_app():
     app.register_blueprint(menus_bp)
     app.register_blueprint(orders_bp)
     
+    # Background worker pool for report exports
+    from app.services.export_jobs import export_jobs
+    export_jobs.init_app(app)
+    
+    # Shared cache for rendered PDFs
+    from app.services.pdf_cache import pdf_cache
+    pdf_cache.init_app(app)
+    
+    # In-process menu catalog
+    from app.services.menu_cache import menu_cache
+    menu_cache.init_app(app)
+    
+    # Fan-out of order changes to Server-Sent Event clients
+    from app.services.order_events import order_events
+    order_events.init_app(app)
+    
+    # Compress larger JSON responses
+    from app.services import compression
+    compression.init_app(app)
+    
+    # Resized variants of uploaded images
+    from app.services.image_pipeline import image_pipeline
+    image_pipeline.init_app(app)
+    
+    # Logged-in admins, cached between requests
+    from app.services.auth_cache import principal_cache
+    principal_cache.init_app(app)
+    
     # Static file serving route
+    from app.services.uploads import send_upload
+    
     @app.route('/static/uploads/<filename>')
     def uploaded_file(filename):
-        upload_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static', 'uploads'))
-        return send_from_directory(upload_dir, filename)
+        return send_upload(filename)
     
     # Import models to register them with SQLAlchemy
-    from app.models import admin, menu, order
+    from app.models import admin, menu, order, export_job, cache_version
     
     return app
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models.admin import Admin
-    return Admin.query.get(int(user_id))
\ No newline at end of file
+    from app.services.auth_cache import principal_cache
+    return principal_cache.load(int(user_id))
\ No newline at end of file
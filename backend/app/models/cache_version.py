@@ -0,0 +1,29 @@
+from app import db
+
+class CacheVersion(db.Model):
+    """Version counters bumped on writes so every worker can tell its in-process caches are stale"""
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def bump(cls, name):
+        """Increment a counter inside the current transaction"""
+        updated = cls.query.filter_by(name=name).update({cls.version: cls.version + 1})
+        if not updated:
+            db.session.add(cls(name=name, version=1))
+    
+    @classmethod
+    def current(cls, name):
+        """Committed value of a counter (0 if it was never bumped)"""
+        return db.session.query(cls.version).filter_by(name=name).scalar() or 0
+    
+    @classmethod
+    def current_many(cls, *names):
+        """Values of several counters in one query, in the order given"""
+        versions = dict(db.session.query(cls.name, cls.version).filter(cls.name.in_(names)))
+        return tuple(versions.get(name, 0) for name in names)
+    
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
\ No newline at end of file
@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime
+import uuid
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.Enum('queued', 'running', 'completed', 'failed', name='export_job_status'), nullable=False, default='queued')
+    params = db.Column(db.JSON)
+    filename = db.Column(db.String(255))
+    file_path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params or {},
+            'filename': self.filename,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.kind} {self.status}>'
@@ -1,9 +1,15 @@
 from app import db
 from datetime import datetime
 from sqlalchemy import Numeric
+from app.services.image_pipeline import image_variants
 
 class Menu(db.Model):
     __tablename__ = 'menus'
+    __table_args__ = (
+        # Category filter + created_at ordering on the menu list
+        db.Index('ix_menus_category_created_at', 'category', 'created_at'),
+        db.Index('ix_menus_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -26,6 +32,7 @@ class Menu(db.Model):
             'price': float(self.price),
             'category': self.category,
             'image_url': self.image_url,
+            'image_variants': image_variants(self.image_url),
             'is_available': self.is_available,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -4,6 +4,11 @@ from sqlalchemy import Numeric
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Status filter + created_at ordering on the list and export queries
+        db.Index('ix_orders_status_created_at', 'status', 'created_at'),
+        db.Index('ix_orders_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(100), nullable=False)
@@ -12,6 +17,10 @@ class Order(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every UPDATE of the row (ORM or bulk), unlike updated_at not limited
+    # to one-second precision; cache keys use it to notice any change
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                        onupdate=db.literal_column('version') + 1)
     
     # Relationship with order items
     order_items = db.relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
@@ -41,8 +50,8 @@ class OrderItem(db.Model):
     __tablename__ = 'order_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
-    menu_id = db.Column(db.Integer, db.ForeignKey('menus.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    menu_id = db.Column(db.Integer, db.ForeignKey('menus.id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     price = db.Column(Numeric(10, 2), nullable=False)  # Price at the time of order
     
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
 from app.models.admin import Admin
+from app.services.auth_cache import principal_cache
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -34,6 +35,7 @@ def login():
 @login_required
 def logout():
     try:
+        principal_cache.invalidate(current_user.id)
         logout_user()
         return jsonify({'message': 'Logout successful'}), 200
     except Exception as e:
@@ -2,9 +2,17 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required
 from app import db
 from app.models.menu import Menu
+from app.models.cache_version import CacheVersion
+from app.services.pagination import keyset_paginate, keyset_paginate_list
+from app.services.http_cache import conditional_json, make_etag
+from app.services.menu_cache import menu_cache
+from app.services.serialization import MENU_FIELDS, parse_fields, select_fields
+from app.services.menu_import import parse_csv, import_menus
+from app.services.image_pipeline import image_pipeline, image_variants
+from app.services.uploads import store_upload, stream_multipart_file
 import os
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-import uuid
 
 bp = Blueprint('menus', __name__, url_prefix='/api/menus')
 
@@ -22,41 +30,162 @@ def get_menus():
         search = request.args.get('search', '')
         category = request.args.get('category', '')
         
+        try:
+            fields = parse_fields(request.args.get('fields', ''), MENU_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Build query
         query = Menu.query
         
-        if search:
-            query = query.filter(Menu.name.contains(search))
-        
         if category:
             query = query.filter(Menu.category == category)
         
-        # Order by created_at desc
-        query = query.order_by(Menu.created_at.desc())
+        # Opt-in cursor mode: keyset pagination without OFFSET or COUNT(*)
+        if 'cursor' in request.args:
+            if search:
+                return search_menus_page(search, category, fields, per_page)
+            
+            # updated_at only has one-second precision; the catalog version moves on every write
+            version = CacheVersion.current(menu_cache.VERSION_KEY)
+            
+            try:
+                menus, next_cursor, prev_cursor = keyset_paginate(
+                    query, Menu, request.args.get('cursor'), per_page
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            total = query.count() if request.args.get('include_total', type=int) else None
+            
+            def build():
+                result = {
+                    'menus': [select_fields(menu.to_dict(), fields) for menu in menus],
+                    'next_cursor': next_cursor,
+                    'prev_cursor': prev_cursor,
+                    'per_page': per_page
+                }
+                if total is not None:
+                    result['total'] = total
+                return result
+            
+            # Skip serialization entirely when the client's copy is current
+            return conditional_json(
+                make_etag(version, [(menu.id, menu.updated_at) for menu in menus], fields, next_cursor, prev_cursor, total),
+                # No Last-Modified: removing a row from a list doesn't advance any timestamp
+                None,
+                build
+            )
+        
+        # Offset pages are served from one snapshot of the in-process catalog cache;
+        # searches are ranked by relevance over name, category and description
+        catalog = menu_cache.snapshot()
+        if search:
+            menus = catalog.search(search, category)
+        else:
+            menus = catalog.list(category)
         
-        # Paginate
-        menus = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
+        # Same clamping as Flask-SQLAlchemy's paginate(error_out=False)
+        page = max(page, 1)
+        if per_page < 1:
+            per_page = 20
+        
+        total = len(menus)
+        pages = -(-total // per_page)
+        items = menus[(page - 1) * per_page:page * per_page]
+        
+        # Skip serialization entirely when the client's copy is current
+        return conditional_json(
+            make_etag(catalog.version, [(menu.id, menu.updated_at) for menu in items], fields, total, page, per_page),
+            # No Last-Modified: removing a row from a list doesn't advance any timestamp
+            None,
+            lambda: {
+                'menus': [select_fields(menu.to_dict(), fields) for menu in items],
+                'total': total,
+                'pages': pages,
+                'current_page': page,
+                'per_page': per_page
+            }
         )
         
-        return jsonify({
-            'menus': [menu.to_dict() for menu in menus.items],
-            'total': menus.total,
-            'pages': menus.pages,
-            'current_page': page,
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch menus', 'details': str(e)}), 500
+
+def search_menus_page(search, category, fields, per_page):
+    """
+    One cursor page of search results, paginated over the cached catalog
+    
+    Pages are ordered newest first like the other cursor pages, so their cursors are
+    interchangeable; the matches never become a database IN list.
+    """
+    catalog = menu_cache.snapshot()
+    matches = sorted(catalog.search(search, category), key=lambda menu: (menu.created_at, menu.id), reverse=True)
+    
+    try:
+        menus, next_cursor, prev_cursor = keyset_paginate_list(matches, request.args.get('cursor'), per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    total = len(matches) if request.args.get('include_total', type=int) else None
+    
+    def build():
+        result = {
+            'menus': [select_fields(menu.to_dict(), fields) for menu in menus],
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
             'per_page': per_page
+        }
+        if total is not None:
+            result['total'] = total
+        return result
+    
+    return conditional_json(
+        make_etag(catalog.version, [menu.id for menu in menus], fields, next_cursor, prev_cursor, total),
+        # No Last-Modified: removing a row from a list doesn't advance any timestamp
+        None,
+        build
+    )
+
+@bp.route('/suggest', methods=['GET'])
+def suggest_menus():
+    """Typo-tolerant search-as-you-type over menu names"""
+    try:
+        q = request.args.get('q', '')
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        available_only = request.args.get('available', 0, type=int) == 1
+        
+        menus = menu_cache.suggest(q, limit, available_only)
+        
+        return jsonify({
+            'suggestions': [
+                {
+                    'id': menu.id,
+                    'name': menu.name,
+                    'category': menu.category,
+                    'price': float(menu.price),
+                    'is_available': menu.is_available
+                }
+                for menu in menus
+            ]
         }), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to fetch menus', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to suggest menus', 'details': str(e)}), 500
 
 @bp.route('/<int:menu_id>', methods=['GET'])
 def get_menu(menu_id):
     try:
-        menu = Menu.query.get_or_404(menu_id)
-        return jsonify({'menu': menu.to_dict()}), 200
+        # The edit form loads from here; it must not show a version older than the database
+        catalog = menu_cache.snapshot(fresh=True)
+        menu = catalog.get(menu_id)
+        if not menu:
+            return jsonify({'error': 'Menu not found'}), 404
+        
+        return conditional_json(
+            make_etag(menu.id, menu.updated_at, catalog.version),
+            menu.updated_at,
+            lambda: {'menu': menu.to_dict()}
+        )
     except Exception as e:
         return jsonify({'error': 'Menu not found', 'details': str(e)}), 404
 
@@ -84,7 +213,9 @@ def create_menu():
         )
         
         db.session.add(menu)
+        menu_cache.invalidate()
         db.session.commit()
+        menu_cache.refresh()
         
         return jsonify({
             'message': 'Menu created successfully',
@@ -95,6 +226,51 @@ def create_menu():
         db.session.rollback()
         return jsonify({'error': 'Failed to create menu', 'details': str(e)}), 500
 
+@bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_import_menus():
+    """Create or update many menus at once from a JSON array or a CSV file"""
+    try:
+        # CSV comes as a multipart upload named 'file' or as a text/csv body
+        try:
+            if 'file' in request.files:
+                records = parse_csv(request.files['file'].read().decode('utf-8-sig'))
+            elif request.mimetype == 'text/csv':
+                records = parse_csv(request.get_data(as_text=True).lstrip('\ufeff'))
+            else:
+                records = request.get_json(silent=True)
+                if isinstance(records, dict):
+                    records = records.get('menus')
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': 'Invalid CSV', 'details': str(e)}), 400
+        
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Provide a non-empty JSON array of menus or a CSV file'}), 400
+        
+        created, updated, errors = import_menus(records)
+        
+        # All or nothing: any invalid row rejects the whole import
+        if errors:
+            db.session.rollback()
+            return jsonify({
+                'error': 'Import rejected; fix the listed rows and retry',
+                'errors': errors
+            }), 400
+        
+        menu_cache.invalidate()
+        db.session.commit()
+        menu_cache.refresh()
+        
+        return jsonify({
+            'message': 'Menus imported successfully',
+            'created': created,
+            'updated': updated
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import menus', 'details': str(e)}), 500
+
 @bp.route('/<int:menu_id>', methods=['PUT'])
 @login_required
 def update_menu(menu_id):
@@ -123,7 +299,9 @@ def update_menu(menu_id):
         if 'is_available' in data:
             menu.is_available = data['is_available']
         
+        menu_cache.invalidate()
         db.session.commit()
+        menu_cache.refresh()
         
         return jsonify({
             'message': 'Menu updated successfully',
@@ -141,7 +319,9 @@ def delete_menu(menu_id):
         menu = Menu.query.get_or_404(menu_id)
         
         db.session.delete(menu)
+        menu_cache.invalidate()
         db.session.commit()
+        menu_cache.refresh()
         
         return jsonify({'message': 'Menu deleted successfully'}), 200
         
@@ -152,44 +332,56 @@ def delete_menu(menu_id):
 @bp.route('/categories', methods=['GET'])
 def get_categories():
     try:
-        categories = db.session.query(Menu.category).distinct().all()
-        categories = [cat[0] for cat in categories]
-        return jsonify({'categories': categories}), 200
+        # Any menu write bumps the catalog version
+        catalog = menu_cache.snapshot()
+        return conditional_json(
+            make_etag('categories', catalog.version),
+            # No Last-Modified: deleting a category's last menu doesn't advance any timestamp
+            None,
+            lambda: {'categories': list(catalog.by_category)}
+        )
     except Exception as e:
         return jsonify({'error': 'Failed to fetch categories', 'details': str(e)}), 500
 
+@bp.route('/cache', methods=['GET'])
+@login_required
+def get_menu_cache_stats():
+    """Hit rate and size of the in-process menu catalog cache"""
+    return jsonify({'cache': menu_cache.stats()}), 200
+
 @bp.route('/upload-image', methods=['POST'])
 @login_required
 def upload_image():
+    def accept_filename(filename):
+        if not filename:
+            raise ValueError('No file selected')
+        if not allowed_file(secure_filename(filename)):
+            raise ValueError('Invalid file type. Only PNG, JPG, JPEG, GIF allowed')
+    
     try:
-        if 'image' not in request.files:
-            return jsonify({'error': 'No image file provided'}), 400
+        # The body is parsed as it arrives instead of through request.files, so the
+        # image is never buffered whole; type and size are checked on the way in
+        chunks = stream_multipart_file(request.stream, request.headers.get('Content-Type', ''), 'image', accept_filename)
         
-        file = request.files['image']
+        # Stored under the hash of its bytes; re-uploading a photo reuses the file
+        filename, created = store_upload(chunks, current_app.config['MAX_IMAGE_BYTES'])
         
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        # Resizing and metadata stripping happen in the background
+        if created:
+            image_pipeline.submit(os.path.join(current_app.config['UPLOAD_DIR'], filename))
         
-        if file and allowed_file(file.filename):
-            # Generate unique filename
-            filename = secure_filename(file.filename)
-            name, ext = os.path.splitext(filename)
-            filename = f"{name}_{uuid.uuid4().hex}{ext}"
-            
-            # Save file
-            upload_path = os.path.join(current_app.instance_path, '..', 'static', 'uploads')
-            os.makedirs(upload_path, exist_ok=True)
-            file_path = os.path.join(upload_path, filename)
-            file.save(file_path)
-            
-            # Return URL
-            image_url = f"/static/uploads/{filename}"
-            return jsonify({
-                'message': 'Image uploaded successfully',
-                'image_url': image_url
-            }), 200
-        else:
-            return jsonify({'error': 'Invalid file type. Only PNG, JPG, JPEG, GIF allowed'}), 400
-            
+        # Return URL
+        image_url = f"/static/uploads/{filename}"
+        return jsonify({
+            'message': 'Image uploaded successfully',
+            'image_url': image_url,
+            'image_variants': image_variants(image_url),
+            'deduplicated': not created
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RequestEntityTooLarge as e:
+        return jsonify({'error': 'Image is too large', 'details': e.description}), 413
     except Exception as e:
         return jsonify({'error': 'Failed to upload image', 'details': str(e)}), 500
\ No newline at end of file
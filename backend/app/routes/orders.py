@@ -1,13 +1,283 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
 from flask_login import login_required
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func
+import tempfile
+import hashlib
+import io
+from sqlalchemy.orm import selectinload
 from app import db
 from app.models.order import Order, OrderItem
 from app.models.menu import Menu
 from app.services.pdf_service import OrderPDFService
+from app.services.pagination import decode_cursor, keyset_paginate, iter_keyset
+from app.services.export_jobs import export_jobs
+from app.services.pdf_cache import pdf_cache
+from app.services.http_cache import conditional_json, make_etag
+from app.services.menu_cache import menu_cache
+from app.services.order_events import order_events, event_stream
+from app.services.order_export import (
+    EXPORT_FORMATS, COLUMNAR_FORMATS, columnar_available, parse_date_range, export_query,
+    export_columns, iter_export_rows, stream_csv, stream_ndjson, write_columnar
+)
+from app.services.serialization import (
+    ORDER_FIELDS, parse_fields, order_rows_query, order_item_rows, order_row_to_dict
+)
+from app.models.export_job import ExportJob
+from app.models.cache_version import CacheVersion
 
 bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
+# Orders fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = 500
+
+# Statuses an order may move to from each status in bulk updates
+STATUS_TRANSITIONS = {
+    'pending': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': {'pending'}
+}
+
+# Ids accepted by one bulk status request, and per UPDATE ... WHERE id IN
+BULK_STATUS_MAX_IDS = 1000
+BULK_STATUS_BATCH_SIZE = 500
+# Largest older_than_minutes a bulk status filter accepts (ten years)
+BULK_STATUS_MAX_AGE_MINUTES = 10 * 365 * 24 * 60
+
+# Rendered reports larger than this are spooled to a temp file instead of memory
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+# cache_versions row bumped whenever an order is created or deleted. Ids can be reused
+# (SQLite without AUTOINCREMENT, MySQL after a restart), so count and max(id) alone
+# don't prove the set of orders is unchanged.
+ORDERS_VERSION_KEY = 'orders'
+
+def orders_with_items():
+    """Order query that loads items and their menus up front (no N+1 on to_dict)"""
+    return Order.query.options(
+        selectinload(Order.order_items).joinedload(OrderItem.menu)
+    )
+
+def resolve_order_items(items_data, check_availability=True):
+    """
+    Validate requested line items against the cached menu catalog
+    
+    Args:
+        items_data: List of dicts with menu_id and quantity
+        check_availability: Reject menus that are marked unavailable
+        
+    Returns:
+        Tuple of (list of (menu, quantity) pairs, error message or None)
+    """
+    for item_data in items_data:
+        if not item_data.get('menu_id') or not item_data.get('quantity'):
+            return None, 'Menu ID and quantity are required for each item'
+    
+    # Menus come from the in-process catalog cache; no per-order menu query
+    menus = menu_cache.get_many({int(item_data['menu_id']) for item_data in items_data})
+    
+    lines = []
+    for item_data in items_data:
+        menu = menus.get(int(item_data['menu_id']))
+        if not menu:
+            return None, f'Menu with ID {item_data["menu_id"]} not found'
+        
+        if check_availability and not menu.is_available:
+            return None, f'Menu "{menu.name}" is not available'
+        
+        quantity = int(item_data['quantity'])
+        if quantity <= 0:
+            return None, 'Quantity must be greater than 0'
+        
+        lines.append((menu, quantity))
+    
+    return lines, None
+
+def insert_order_items(order_id, lines):
+    """Insert order items in one multi-row INSERT and return the order total"""
+    db.session.bulk_insert_mappings(OrderItem, [
+        {
+            'order_id': order_id,
+            'menu_id': menu.id,
+            'quantity': quantity,
+            'price': menu.price
+        }
+        for menu, quantity in lines
+    ])
+    return sum(quantity * menu.price for menu, quantity in lines)
+
+def apply_order_item_changes(order, lines):
+    """
+    Diff requested lines against the order's existing items instead of replacing them
+    
+    Existing items are matched to requested lines by menu. Matched items keep their
+    original price and only have their quantity updated when it changed; unmatched
+    lines are inserted and leftover items are deleted.
+    
+    Returns:
+        Tuple of (new order total, computed from the previous total plus the change;
+        True if any item was inserted, updated or deleted)
+    """
+    existing = {}
+    for item in order.order_items:
+        existing.setdefault(item.menu_id, []).append(item)
+    
+    total_amount = order.total_amount or 0
+    changed = False
+    new_lines = []
+    for menu, quantity in lines:
+        matches = existing.get(menu.id)
+        if matches:
+            item = matches.pop(0)
+            if item.quantity != quantity:
+                total_amount += (quantity - item.quantity) * item.price
+                item.quantity = quantity
+                changed = True
+        else:
+            new_lines.append((menu, quantity))
+    
+    for items in existing.values():
+        for item in items:
+            total_amount -= item.quantity * item.price
+            db.session.delete(item)
+            changed = True
+    
+    if new_lines:
+        total_amount += insert_order_items(order.id, new_lines)
+        changed = True
+    
+    return total_amount, changed
+
+def order_report_summary(status=''):
+    """Report summary statistics for orders (optionally of one status) computed in SQL"""
+    query = db.session.query(
+        Order.status,
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total_amount), 0)
+    )
+    if status:
+        query = query.filter(Order.status == status)
+    
+    counts = {'pending': 0, 'completed': 0, 'cancelled': 0}
+    total_revenue = 0
+    for row_status, count, revenue in query.group_by(Order.status).all():
+        counts[row_status] = count
+        total_revenue += float(revenue)
+    
+    return {
+        'total_orders': sum(counts.values()),
+        'total_revenue': total_revenue,
+        'pending_orders': counts['pending'],
+        'completed_orders': counts['completed'],
+        'cancelled_orders': counts['cancelled']
+    }
+
+def render_orders_report(params, output):
+    """Render the bulk orders PDF report for the given filters into output"""
+    status = params.get('status', '')
+    
+    # Build query
+    query = orders_with_items()
+    
+    if status:
+        query = query.filter(Order.status == status)
+    
+    # Newest first, fetched in keyset batches while the PDF is laid out
+    orders = (order for batch in iter_keyset(query, Order, EXPORT_BATCH_SIZE) for order in batch)
+    
+    return OrderPDFService().generate_orders_pdf(
+        orders,
+        summary=order_report_summary(status),
+        output=output
+    )
+
+def transition_sources(status):
+    """Statuses from which an order may move to status"""
+    return sorted(source for source, targets in STATUS_TRANSITIONS.items() if status in targets)
+
+def set_orders_status(order_ids, status):
+    """
+    Move orders to status with batched UPDATE ... WHERE id IN statements
+    
+    The UPDATE also requires a valid source status, so an order changed concurrently
+    since it was selected is left alone.
+    
+    Returns:
+        Number of orders updated
+    """
+    updated = 0
+    sources = transition_sources(status)
+    for start in range(0, len(order_ids), BULK_STATUS_BATCH_SIZE):
+        updated += Order.query.filter(
+            Order.id.in_(order_ids[start:start + BULK_STATUS_BATCH_SIZE]),
+            Order.status.in_(sources)
+        ).update(
+            {Order.status: status, Order.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+    return updated
+
+def orders_report_filename(status):
+    """Download filename for the bulk orders report"""
+    if status:
+        return f"orders_{status}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return f"all_orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+
+def stream_orders_ndjson(query, fields, with_items):
+    """Yield one JSON line per order, fetching orders and their items batch by batch"""
+    for rows in iter_keyset(query, Order, EXPORT_BATCH_SIZE):
+        items = order_item_rows([row.id for row in rows]) if with_items else {}
+        for row in rows:
+            yield current_app.json.dumps(order_row_to_dict(row, items.get(row.id), fields)) + '\n'
+
+def order_etag(order_id, version, created_at, menus_version):
+    """
+    ETag for one order, from its row alone
+    
+    Every update of the order (item edits included) bumps its version; created_at tells
+    a new order apart from a deleted one whose id it reused, and the menu catalog version
+    covers renamed menus shown on its items.
+    """
+    return make_etag('order', order_id, version, created_at, menus_version)
+
+def order_pdf_cache_key(order):
+    """Cache key for a single order receipt: id, updated_at and a digest of the printed fields"""
+    fingerprint = hashlib.sha1(repr((
+        order.customer_name,
+        order.status,
+        order.notes,
+        order.created_at,
+        order.total_amount,
+        [(item.id, item.quantity, item.menu.name, item.menu.price) for item in order.order_items]
+    )).encode()).hexdigest()
+    return ('order', order.id, order.updated_at, fingerprint)
+
+def orders_state(status=''):
+    """
+    Aggregates that change whenever the orders matching a status filter, or anything
+    shown for them, do
+    
+    Every update of an order (item edits included) bumps its version, so the version
+    sum grows with each change; count, max(id) and the orders version catch deletions
+    and insertions. The menu catalog version covers renamed or repriced menus.
+    
+    Returns:
+        Tuple of (count, max id, version sum, orders version, menus version)
+    """
+    query = db.session.query(
+        func.count(Order.id),
+        func.max(Order.id),
+        func.sum(Order.version)
+    )
+    if status:
+        query = query.filter(Order.status == status)
+    
+    return tuple(query.one()) + CacheVersion.current_many(ORDERS_VERSION_KEY, menu_cache.VERSION_KEY)
+
+def orders_report_cache_key(status=''):
+    """Cache key for the bulk report: the filter plus orders_state"""
+    return ('orders_report', status) + orders_state(status)
+
 @bp.route('', methods=['GET'])
 @login_required
 def get_orders():
@@ -17,39 +287,163 @@ def get_orders():
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status', '')
         
-        # Build query
-        query = Order.query
+        try:
+            fields = parse_fields(request.args.get('fields', ''), ORDER_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        with_items = fields is None or 'order_items' in fields
+        
+        # Read-only list: select plain columns instead of hydrating Order objects
+        query = order_rows_query()
         
         if status:
             query = query.filter(Order.status == status)
         
-        # Order by created_at desc
-        query = query.order_by(Order.created_at.desc())
+        # Bulk mode: stream every matching order as NDJSON while it is being fetched
+        if request.args.get('format') == 'ndjson':
+            return Response(
+                stream_with_context(stream_orders_ndjson(query, fields, with_items)),
+                mimetype='application/x-ndjson'
+            )
         
-        # Paginate
-        orders = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        # The ETag comes from one aggregate over the filtered orders, so a client whose
+        # copy is current gets its 304 before any page or item is loaded
+        state = orders_state(status)
+        
+        # Opt-in cursor mode: keyset pagination without OFFSET or COUNT(*)
+        if 'cursor' in request.args:
+            cursor = request.args.get('cursor')
+            include_total = bool(request.args.get('include_total', type=int))
+            try:
+                if cursor:
+                    decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            def build():
+                rows, next_cursor, prev_cursor = keyset_paginate(query, Order, cursor, per_page)
+                items = order_item_rows([row.id for row in rows]) if with_items else {}
+                result = {
+                    'orders': [order_row_to_dict(row, items.get(row.id), fields) for row in rows],
+                    'next_cursor': next_cursor,
+                    'prev_cursor': prev_cursor,
+                    'per_page': per_page
+                }
+                if include_total:
+                    result['total'] = state[0]
+                return result
+            
+            return conditional_json(
+                make_etag('orders', state, fields, cursor, per_page, include_total),
+                # No Last-Modified: removing a row from a list doesn't advance any timestamp
+                None,
+                build
+            )
+        
+        def build():
+            # Order by created_at desc
+            # The aggregate already counted the matching orders; don't count them again
+            orders = query.order_by(Order.created_at.desc()).paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False,
+                count=False
+            )
+            orders.total = state[0]
+            items = order_item_rows([row.id for row in orders.items]) if with_items else {}
+            return {
+                'orders': [order_row_to_dict(row, items.get(row.id), fields) for row in orders.items],
+                'total': orders.total,
+                'pages': orders.pages,
+                'current_page': page,
+                'per_page': per_page
+            }
+        
+        return conditional_json(
+            make_etag('orders', state, fields, page, per_page),
+            # No Last-Modified: removing a row from a list doesn't advance any timestamp
+            None,
+            build
         )
         
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch orders', 'details': str(e)}), 500
+
+@bp.route('/summary', methods=['GET'])
+@login_required
+def get_orders_summary():
+    """Dashboard statistics computed with SQL aggregates"""
+    try:
+        top = request.args.get('top', 5, type=int)
+        
+        # Today starts at local midnight (tz_offset in minutes east of UTC), converted
+        # to the naive UTC that created_at is stored in
+        tz_offset = request.args.get('tz_offset', current_app.config['TIMEZONE_OFFSET_MINUTES'], type=int)
+        if not -14 * 60 <= tz_offset <= 14 * 60:
+            return jsonify({'error': 'tz_offset must be between -840 and 840 minutes'}), 400
+        offset = timedelta(minutes=tz_offset)
+        today_start = (datetime.utcnow() + offset).replace(hour=0, minute=0, second=0, microsecond=0) - offset
+        
+        # Order count per status
+        status_counts = {'pending': 0, 'completed': 0, 'cancelled': 0}
+        rows = db.session.query(Order.status, func.count(Order.id)).group_by(Order.status).all()
+        for status, count in rows:
+            status_counts[status] = count
+        
+        # Revenue from completed orders, overall and for today
+        total_revenue, today_revenue = db.session.query(
+            func.coalesce(func.sum(Order.total_amount), 0),
+            func.coalesce(func.sum(db.case((Order.created_at >= today_start, Order.total_amount), else_=0)), 0)
+        ).filter(Order.status == 'completed').one()
+        
+        # Best-selling menus across completed orders
+        quantity_sold = func.sum(OrderItem.quantity)
+        top_menus = db.session.query(
+            Menu.id,
+            Menu.name,
+            quantity_sold,
+            func.sum(OrderItem.quantity * OrderItem.price)
+        ).join(OrderItem, OrderItem.menu_id == Menu.id) \
+         .join(Order, Order.id == OrderItem.order_id) \
+         .filter(Order.status == 'completed') \
+         .group_by(Menu.id, Menu.name) \
+         .order_by(quantity_sold.desc()) \
+         .limit(top).all()
+        
         return jsonify({
-            'orders': [order.to_dict() for order in orders.items],
-            'total': orders.total,
-            'pages': orders.pages,
-            'current_page': page,
-            'per_page': per_page
+            'summary': {
+                'total_menus': db.session.query(func.count(Menu.id)).scalar(),
+                'total_orders': sum(status_counts.values()),
+                'status_counts': status_counts,
+                'total_revenue': float(total_revenue),
+                'today_revenue': float(today_revenue),
+                'top_menus': [
+                    {
+                        'menu_id': menu_id,
+                        'name': name,
+                        'quantity': int(quantity),
+                        'revenue': float(revenue)
+                    }
+                    for menu_id, name, quantity, revenue in top_menus
+                ]
+            }
         }), 200
         
     except Exception as e:
-        return jsonify({'error': 'Failed to fetch orders', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to fetch order summary', 'details': str(e)}), 500
 
 @bp.route('/<int:order_id>', methods=['GET'])
 @login_required
 def get_order(order_id):
     try:
-        order = Order.query.get_or_404(order_id)
-        return jsonify({'order': order.to_dict()}), 200
+        # Validators come from the order row alone; items are only loaded on a miss
+        row = db.session.query(Order.version, Order.created_at, Order.updated_at) \
+            .filter(Order.id == order_id).first_or_404()
+        return conditional_json(
+            order_etag(order_id, row.version, row.created_at, CacheVersion.current(menu_cache.VERSION_KEY)),
+            row.updated_at,
+            lambda: {'order': orders_with_items().filter(Order.id == order_id).one().to_dict()}
+        )
     except Exception as e:
         return jsonify({'error': 'Order not found', 'details': str(e)}), 404
 
@@ -65,6 +459,11 @@ def create_order():
         if not isinstance(data['items'], list) or len(data['items']) == 0:
             return jsonify({'error': 'At least one item is required'}), 400
         
+        # Validate all items before touching the database
+        lines, error = resolve_order_items(data['items'])
+        if error:
+            return jsonify({'error': error}), 400
+        
         # Create order
         order = Order(
             customer_name=data['customer_name'],
@@ -76,42 +475,21 @@ def create_order():
         db.session.flush()  # To get the order ID
         
         # Add order items
-        total_amount = 0
-        for item_data in data['items']:
-            if not item_data.get('menu_id') or not item_data.get('quantity'):
-                return jsonify({'error': 'Menu ID and quantity are required for each item'}), 400
-            
-            menu = Menu.query.get(item_data['menu_id'])
-            if not menu:
-                return jsonify({'error': f'Menu with ID {item_data["menu_id"]} not found'}), 400
-            
-            if not menu.is_available:
-                return jsonify({'error': f'Menu "{menu.name}" is not available'}), 400
-            
-            quantity = int(item_data['quantity'])
-            if quantity <= 0:
-                return jsonify({'error': 'Quantity must be greater than 0'}), 400
-            
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_id=menu.id,
-                quantity=quantity,
-                price=menu.price
-            )
-            
-            db.session.add(order_item)
-            total_amount += quantity * menu.price
+        total_amount = insert_order_items(order.id, lines)
         
         # Update order total
         order.total_amount = total_amount
+        CacheVersion.bump(ORDERS_VERSION_KEY)
         db.session.commit()
         
-        # Refresh to get order items
-        db.session.refresh(order)
+        # Reload with items and menus in a constant number of queries
+        order = orders_with_items().filter(Order.id == order.id).one()
+        order_data = order.to_dict()
+        order_events.publish('created', order_data)
         
         return jsonify({
             'message': 'Order created successfully',
-            'order': order.to_dict()
+            'order': order_data
         }), 201
         
     except ValueError as e:
@@ -125,7 +503,8 @@ def create_order():
 @login_required
 def update_order(order_id):
     try:
-        order = Order.query.get_or_404(order_id)
+        # Lock the order row so concurrent edits apply their item diffs one at a time
+        order = Order.query.filter(Order.id == order_id).with_for_update().first_or_404()
         data = request.get_json()
         
         if not data:
@@ -145,41 +524,29 @@ def update_order(order_id):
         
         # Update order items if provided
         if 'items' in data:
-            # Remove existing order items
-            for item in order.order_items:
-                db.session.delete(item)
+            lines, error = resolve_order_items(data['items'], check_availability=False)
+            if error:
+                db.session.rollback()
+                return jsonify({'error': error}), 400
             
-            # Add new order items
-            total_amount = 0
-            for item_data in data['items']:
-                menu = Menu.query.get(item_data['menu_id'])
-                if not menu:
-                    return jsonify({'error': f'Menu with ID {item_data["menu_id"]} not found'}), 400
-                
-                quantity = int(item_data['quantity'])
-                if quantity <= 0:
-                    return jsonify({'error': 'Quantity must be greater than 0'}), 400
-                
-                order_item = OrderItem(
-                    order_id=order.id,
-                    menu_id=menu.id,
-                    quantity=quantity,
-                    price=menu.price
-                )
-                
-                db.session.add(order_item)
-                total_amount += quantity * menu.price
+            # Only touch the rows that actually changed
+            order.total_amount, items_changed = apply_order_item_changes(order, lines)
             
-            order.total_amount = total_amount
+            # Item edits can leave the order row itself unchanged (e.g. swapping a menu
+            # for one with the same price); touch it so updated_at and version move
+            if items_changed:
+                order.updated_at = datetime.utcnow()
         
         db.session.commit()
         
-        # Refresh to get updated order items
-        db.session.refresh(order)
+        # Reload with updated items and menus in a constant number of queries
+        order = orders_with_items().filter(Order.id == order.id).one()
+        order_data = order.to_dict()
+        order_events.publish('updated', order_data)
         
         return jsonify({
             'message': 'Order updated successfully',
-            'order': order.to_dict()
+            'order': order_data
         }), 200
         
     except ValueError as e:
@@ -196,7 +563,9 @@ def delete_order(order_id):
         order = Order.query.get_or_404(order_id)
         
         db.session.delete(order)
+        CacheVersion.bump(ORDERS_VERSION_KEY)
         db.session.commit()
+        order_events.publish('deleted', {'id': order_id})
         
         return jsonify({'message': 'Order deleted successfully'}), 200
         
@@ -219,6 +588,7 @@ def update_order_status(order_id):
         
         order.status = data['status']
         db.session.commit()
+        order_events.publish('status_changed', {'ids': [order.id], 'status': order.status})
         
         return jsonify({
             'message': 'Order status updated successfully',
@@ -229,6 +599,144 @@ def update_order_status(order_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update order status', 'details': str(e)}), 500
 
+@bp.route('/status', methods=['PUT'])
+@login_required
+def bulk_update_order_status():
+    """
+    Apply a status transition to many orders at once
+    
+    The body names the target status and either a list of ids or a filter, e.g.
+    {"status": "completed", "filter": {"status": "pending", "older_than_minutes": 30}}.
+    Only transitions allowed by STATUS_TRANSITIONS are applied.
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or 'status' not in data:
+            return jsonify({'error': 'Status is required'}), 400
+        
+        status = data['status']
+        if status not in STATUS_TRANSITIONS:
+            return jsonify({'error': 'Invalid status. Must be pending, completed, or cancelled'}), 400
+        
+        if ('ids' in data) == ('filter' in data):
+            return jsonify({'error': 'Provide either ids or filter'}), 400
+        
+        sources = transition_sources(status)
+        skipped = []
+        
+        # Lock the selected rows so the reported result matches what is written
+        query = db.session.query(Order.id, Order.status).with_for_update()
+        
+        if 'ids' in data:
+            ids = data['ids']
+            if not isinstance(ids, list) or not ids:
+                return jsonify({'error': 'ids must be a non-empty list'}), 400
+            if len(ids) > BULK_STATUS_MAX_IDS:
+                return jsonify({'error': f'At most {BULK_STATUS_MAX_IDS} ids per request'}), 400
+            try:
+                ids = list(dict.fromkeys(int(order_id) for order_id in ids))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'ids must be integers'}), 400
+            
+            current = dict(query.filter(Order.id.in_(ids)).all())
+            order_ids = []
+            for order_id in ids:
+                if order_id not in current:
+                    skipped.append({'id': order_id, 'reason': 'not_found'})
+                elif current[order_id] not in sources:
+                    skipped.append({'id': order_id, 'reason': 'invalid_transition', 'status': current[order_id]})
+                else:
+                    order_ids.append(order_id)
+        else:
+            criteria = data['filter']
+            if not isinstance(criteria, dict):
+                return jsonify({'error': 'filter must be an object'}), 400
+            
+            from_status = criteria.get('status')
+            if from_status is not None and from_status not in STATUS_TRANSITIONS:
+                return jsonify({'error': 'Invalid filter status. Must be pending, completed, or cancelled'}), 400
+            if from_status is not None and from_status not in sources:
+                return jsonify({'error': f'Cannot move orders from {from_status} to {status}'}), 400
+            
+            query = query.filter(Order.status.in_([from_status] if from_status else sources))
+            
+            try:
+                older_than = criteria.get('older_than_minutes')
+                if older_than is not None:
+                    minutes = float(older_than)
+                    # Also rejects nan and inf, which timedelta can't represent
+                    if isinstance(older_than, bool) or not 0 <= minutes <= BULK_STATUS_MAX_AGE_MINUTES:
+                        return jsonify({
+                            'error': f'older_than_minutes must be between 0 and {BULK_STATUS_MAX_AGE_MINUTES}'
+                        }), 400
+                    cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+                    query = query.filter(Order.created_at < cutoff)
+                if criteria.get('created_before'):
+                    cutoff = datetime.fromisoformat(criteria['created_before'])
+                    if cutoff.tzinfo:
+                        # created_at is stored as naive UTC
+                        cutoff = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+                    query = query.filter(Order.created_at < cutoff)
+            except (TypeError, ValueError, OverflowError):
+                return jsonify({'error': 'older_than_minutes must be a number and created_before an ISO datetime'}), 400
+            
+            order_ids = [order_id for order_id, _ in query.order_by(Order.id).limit(BULK_STATUS_MAX_IDS + 1)]
+            if len(order_ids) > BULK_STATUS_MAX_IDS:
+                db.session.rollback()
+                return jsonify({'error': f'Filter matches more than {BULK_STATUS_MAX_IDS} orders; narrow it down'}), 400
+        
+        updated = set_orders_status(order_ids, status) if order_ids else 0
+        db.session.commit()
+        if updated:
+            order_events.publish('status_changed', {'ids': order_ids, 'status': status})
+        
+        return jsonify({
+            'message': f'{updated} orders updated',
+            'status': status,
+            'updated': order_ids,
+            'skipped': skipped
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update order status', 'details': str(e)}), 500
+
+@bp.route('/stream', methods=['GET'])
+@login_required
+def stream_order_events():
+    """
+    Server-Sent Events feed of order changes
+    
+    Events are created, updated, deleted and status_changed; a resync event means
+    events were missed and the client should reload. Reconnecting browsers send
+    Last-Event-ID and receive the events they missed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscriber = order_events.subscribe(last_event_id)
+    if subscriber is None:
+        # Every stream slot of this worker is taken; keep the threads for normal requests
+        response = jsonify({'error': 'Too many live order feeds open, retry later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    # Not wrapped in stream_with_context: the stream needs no request state, and the
+    # DB session is released when the request context ends instead of being held open
+    response = Response(
+        event_stream(order_events, subscriber, current_app.config['ORDER_EVENTS_HEARTBEAT_SECONDS']),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/stream/stats', methods=['GET'])
+@login_required
+def get_order_stream_stats():
+    """Connected clients and event counters of the order feed"""
+    return jsonify({'stream': order_events.stats()}), 200
+
 @bp.route('/export-pdf', methods=['GET'])
 @login_required
 def export_orders_pdf():
@@ -237,37 +745,161 @@ def export_orders_pdf():
         # Get query parameters for filtering
         status = request.args.get('status', '')
         
-        # Build query
-        query = Order.query
+        # Serve an identical earlier render if nothing in the report has changed
+        cache_key = orders_report_cache_key(status)
+        cached = pdf_cache.get(cache_key)
         
-        if status:
-            query = query.filter(Order.status == status)
+        if cached is not None:
+            pdf_buffer = io.BytesIO(cached)
+        else:
+            # Generate PDF into a spooled temp file so large reports don't stay in memory
+            pdf_buffer = render_orders_report(
+                {'status': status},
+                tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+            )
+            
+            # Only reports small enough for the cache are read back into memory
+            size = pdf_buffer.seek(0, io.SEEK_END)
+            pdf_buffer.seek(0)
+            if size <= pdf_cache.max_entry_bytes:
+                pdf_cache.put(cache_key, pdf_buffer.read())
+                pdf_buffer.seek(0)
         
-        # Order by created_at desc and get all orders
-        orders = query.order_by(Order.created_at.desc()).all()
+        # Return PDF as download
+        response = send_file(
+            pdf_buffer,
+            as_attachment=True,
+            download_name=orders_report_filename(status),
+            mimetype='application/pdf'
+        )
+        response.headers['X-Cache'] = 'HIT' if cached is not None else 'MISS'
+        return response
         
-        # Create PDF service instance
-        pdf_service = OrderPDFService()
+    except Exception as e:
+        return jsonify({'error': 'Failed to export orders to PDF', 'details': str(e)}), 500
+
+@bp.route('/export', methods=['GET'])
+@login_required
+def export_orders():
+    """Bulk export orders as CSV, NDJSON, Parquet or Arrow for analytics tools"""
+    try:
+        fmt = request.args.get('format', 'csv')
+        status = request.args.get('status', '')
+        rows = request.args.get('rows', 'items')
         
-        # Generate PDF
-        pdf_buffer = pdf_service.generate_orders_pdf(orders)
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"Invalid format. Must be one of {', '.join(EXPORT_FORMATS)}"}), 400
         
-        # Determine filename based on filter
-        if status:
-            filename = f"orders_{status}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        if status and status not in ['pending', 'completed', 'cancelled']:
+            return jsonify({'error': 'Invalid status. Must be pending, completed, or cancelled'}), 400
+        
+        if rows not in ['items', 'orders']:
+            return jsonify({'error': 'Invalid rows. Must be items or orders'}), 400
+        
+        try:
+            start, end = parse_date_range(request.args.get('start_date', ''), request.args.get('end_date', ''))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Parquet/Arrow need pyarrow; without it the export degrades to CSV
+        if fmt in COLUMNAR_FORMATS and not columnar_available():
+            fmt = 'csv'
+        
+        with_items = rows == 'items'
+        query = export_query(status, start, end)
+        batches = iter_export_rows(query, with_items, EXPORT_BATCH_SIZE)
+        filename = f"orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        
+        if fmt in COLUMNAR_FORMATS:
+            output = write_columnar(
+                batches, with_items, fmt,
+                tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+            )
+            response = send_file(
+                output,
+                as_attachment=True,
+                download_name=filename,
+                mimetype='application/vnd.apache.parquet' if fmt == 'parquet'
+                         else 'application/vnd.apache.arrow.stream'
+            )
         else:
-            filename = f"all_orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            # Text formats stream batch by batch without holding the export in memory
+            stream = stream_csv if fmt == 'csv' else stream_ndjson
+            response = Response(
+                stream_with_context(stream(batches, export_columns(with_items))),
+                mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson'
+            )
+            response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+        
+        response.headers['X-Export-Format'] = fmt
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to export orders', 'details': str(e)}), 500
+
+@bp.route('/export-jobs', methods=['POST'])
+@login_required
+def create_export_job():
+    """Queue the bulk orders PDF report to be rendered in the background"""
+    try:
+        data = request.get_json(silent=True) or {}
+        status = data.get('status', '')
+        
+        if status and status not in ['pending', 'completed', 'cancelled']:
+            return jsonify({'error': 'Invalid status. Must be pending, completed, or cancelled'}), 400
+        
+        job = export_jobs.submit(
+            'orders_pdf',
+            {'status': status},
+            orders_report_filename(status),
+            render_orders_report
+        )
+        
+        return jsonify({
+            'message': 'Export job queued',
+            'job': job.to_dict()
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to queue export job', 'details': str(e)}), 500
+
+@bp.route('/export-jobs/<job_id>', methods=['GET'])
+@login_required
+def get_export_job(job_id):
+    """Poll the status of an export job"""
+    job = db.session.get(ExportJob, job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    
+    # A job orphaned by a restarted worker would otherwise be polled forever
+    if export_jobs.is_stale(job):
+        export_jobs.fail_stale()
+        db.session.refresh(job)
+    
+    return jsonify({'job': job.to_dict()}), 200
+
+@bp.route('/export-jobs/<job_id>/download', methods=['GET'])
+@login_required
+def download_export_job(job_id):
+    """Download the file produced by a completed export job"""
+    try:
+        job = db.session.get(ExportJob, job_id)
+        if not job:
+            return jsonify({'error': 'Export job not found'}), 404
+        
+        if job.status != 'completed':
+            return jsonify({'error': f'Export job is {job.status}', 'job': job.to_dict()}), 409
         
-        # Return PDF as download
         return send_file(
-            pdf_buffer,
+            job.file_path,
             as_attachment=True,
-            download_name=filename,
+            download_name=job.filename,
             mimetype='application/pdf'
         )
         
     except Exception as e:
-        return jsonify({'error': 'Failed to export orders to PDF', 'details': str(e)}), 500
+        return jsonify({'error': 'Failed to download export', 'details': str(e)}), 500
 
 @bp.route('/<int:order_id>/export-pdf', methods=['GET'])
 @login_required
@@ -275,24 +907,40 @@ def export_single_order_pdf(order_id):
     """Export single order to PDF"""
     try:
         # Get the order
-        order = Order.query.get_or_404(order_id)
+        order = orders_with_items().filter(Order.id == order_id).first_or_404()
         
-        # Create PDF service instance
-        pdf_service = OrderPDFService()
+        # Receipts only change when the order (or a menu on it) does
+        cache_key = order_pdf_cache_key(order)
+        cached = pdf_cache.get(cache_key)
         
-        # Generate PDF
-        pdf_buffer = pdf_service.generate_single_order_pdf(order)
+        if cached is None:
+            # Create PDF service instance
+            pdf_service = OrderPDFService()
+            
+            # Generate PDF
+            pdf_bytes = pdf_service.generate_single_order_pdf(order).getvalue()
+            pdf_cache.put(cache_key, pdf_bytes)
+        else:
+            pdf_bytes = cached
         
         # Create filename
         filename = f"order_{order.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
         # Return PDF as download
-        return send_file(
-            pdf_buffer,
+        response = send_file(
+            io.BytesIO(pdf_bytes),
             as_attachment=True,
             download_name=filename,
             mimetype='application/pdf'
         )
+        response.headers['X-Cache'] = 'HIT' if cached is not None else 'MISS'
+        return response
         
     except Exception as e:
-        return jsonify({'error': 'Failed to export order to PDF', 'details': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to export order to PDF', 'details': str(e)}), 500
+
+@bp.route('/pdf-cache', methods=['GET'])
+@login_required
+def get_pdf_cache_stats():
+    """Hit/miss counters and occupancy of the rendered PDF cache"""
+    return jsonify({'cache': pdf_cache.stats()}), 200
\ No newline at end of file
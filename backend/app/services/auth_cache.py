@@ -0,0 +1,84 @@
+from flask_login import UserMixin
+from sqlalchemy import event
+from app import db
+from app.models.admin import Admin
+import threading
+import time
+
+class CachedAdmin(UserMixin):
+    """Read-only snapshot of a logged-in admin, without the password hash"""
+
+    __slots__ = ('id', 'username', 'created_at', '_data')
+
+    def __init__(self, admin):
+        self.id = admin.id
+        self.username = admin.username
+        self.created_at = admin.created_at
+        self._data = admin.to_dict()
+
+    def to_dict(self):
+        return dict(self._data)
+
+class PrincipalCache:
+    """
+    Short-lived per-process cache of the admins Flask-Login loads for each request
+
+    Saves the admins lookup on every @login_required call. Entries expire after
+    AUTH_CACHE_TTL_SECONDS (0 disables the cache) and are dropped on logout and on any
+    update or delete of the admin in this process; other workers may keep serving a
+    changed or deleted admin until their entry expires.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Read the entry lifetime from the application config"""
+        self.ttl = app.config.get('AUTH_CACHE_TTL_SECONDS', self.ttl)
+        app.extensions['principal_cache'] = self
+
+    def load(self, user_id):
+        """The admin with this id, from the cache or the database, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        admin = db.session.get(Admin, user_id)
+        if admin is None:
+            self.invalidate(user_id)
+            return None
+
+        principal = CachedAdmin(admin)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, principal)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Drop one admin's entry, or every entry"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self):
+        """Hit/miss counters and number of cached admins"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+principal_cache = PrincipalCache()
+
+@event.listens_for(Admin, 'after_update')
+@event.listens_for(Admin, 'after_delete')
+def _invalidate_admin(mapper, connection, target):
+    # Password changes and deletions take effect on the next request
+    principal_cache.invalidate(target.id)
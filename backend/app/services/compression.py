@@ -0,0 +1,49 @@
+from flask import request
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+
+def init_app(app):
+    """Compress JSON responses above COMPRESS_MIN_SIZE bytes with brotli or gzip"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.status_code in (204, 206)
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding == 'br':
+            data = brotli.compress(data, quality=min(app.config['COMPRESS_LEVEL'], 11))
+        elif encoding == 'gzip':
+            data = gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL'])
+        else:
+            return response
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed bytes differ from the identity representation
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
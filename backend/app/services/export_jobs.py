@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.export_job import ExportJob
+import os
+
+class ExportJobQueue:
+    """
+    Runs report exports on a local thread pool so request workers are never blocked
+
+    Job state lives in the export_jobs table, so any worker process can answer status
+    polls; rendered files are written under the instance folder.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.export_dir = None
+
+    def init_app(self, app):
+        """Create the worker pool and export directory for an application"""
+        app.config.setdefault('EXPORT_WORKERS', 2)
+        app.config.setdefault('EXPORT_JOB_TTL_HOURS', 24)
+        app.config.setdefault('EXPORT_JOB_TIMEOUT_MINUTES', 30)
+
+        self.export_dir = os.path.join(app.instance_path, 'exports')
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config['EXPORT_WORKERS'],
+            thread_name_prefix='export-job'
+        )
+        app.extensions['export_jobs'] = self
+
+    def submit(self, kind, params, filename, render):
+        """
+        Queue a new export job
+
+        Args:
+            kind: Short label for the export type (e.g. 'orders_pdf')
+            params: JSON-serializable filter parameters passed to render
+            filename: Download filename for the finished file
+            render: Callable (params, output) that writes the export into a binary file
+
+        Returns:
+            The created ExportJob (status 'queued')
+        """
+        self.purge_expired()
+
+        job = ExportJob(kind=kind, params=params, filename=filename)
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        self.executor.submit(self._run, app, job.id, render)
+        return job
+
+    def _run(self, app, job_id, render):
+        """Render one job inside its own application context"""
+        with app.app_context():
+            file_path = None
+            try:
+                job = db.session.get(ExportJob, job_id)
+                # Already failed as stale (or purged) while waiting for a worker
+                if job is None or job.status != 'queued':
+                    return
+                job.status = 'running'
+                db.session.commit()
+
+                file_path = os.path.join(self.export_dir, f"{job.id}_{job.filename}")
+                # Write to a partial file first so downloads never see half a report
+                with open(file_path + '.part', 'wb') as output:
+                    render(job.params or {}, output)
+                os.replace(file_path + '.part', file_path)
+
+                job.status = 'completed'
+                job.file_path = file_path
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                if file_path and os.path.exists(file_path + '.part'):
+                    os.remove(file_path + '.part')
+                job = db.session.get(ExportJob, job_id)
+                if job is not None:
+                    job.status = 'failed'
+                    job.error = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+
+    def is_stale(self, job):
+        """Whether a queued or running job has gone EXPORT_JOB_TIMEOUT_MINUTES without progress"""
+        return job.status in ('queued', 'running') and job.updated_at < self._stale_cutoff()
+
+    def fail_stale(self):
+        """
+        Mark queued or running jobs that stopped progressing as failed
+
+        A job's worker thread dies with its process, so after a restart nothing would
+        ever finish it; pollers would wait on it forever.
+
+        Returns:
+            Number of jobs marked as failed
+        """
+        timeout = current_app.config['EXPORT_JOB_TIMEOUT_MINUTES']
+        count = ExportJob.query.filter(
+            ExportJob.status.in_(['queued', 'running']),
+            ExportJob.updated_at < self._stale_cutoff()
+        ).update({
+            'status': 'failed',
+            'error': f'Export did not finish within {timeout} minutes',
+            'finished_at': datetime.utcnow()
+        }, synchronize_session=False)
+
+        if count:
+            db.session.commit()
+        return count
+
+    def _stale_cutoff(self):
+        return datetime.utcnow() - timedelta(minutes=current_app.config['EXPORT_JOB_TIMEOUT_MINUTES'])
+
+    def purge_expired(self):
+        """Fail stale jobs, then delete finished jobs (and their files) older than EXPORT_JOB_TTL_HOURS"""
+        self.fail_stale()
+
+        cutoff = datetime.utcnow() - timedelta(hours=current_app.config['EXPORT_JOB_TTL_HOURS'])
+        expired = ExportJob.query.filter(
+            ExportJob.status.in_(['completed', 'failed']),
+            ExportJob.finished_at < cutoff
+        ).all()
+
+        for job in expired:
+            if job.file_path and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            db.session.delete(job)
+
+        if expired:
+            db.session.commit()
+
+export_jobs = ExportJobQueue()
@@ -0,0 +1,55 @@
+from flask import request, jsonify, current_app
+from datetime import datetime, timedelta, timezone
+import hashlib
+
+def make_etag(*parts):
+    """Strong ETag value from the values that determine a response body"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def settled(last_modified):
+    """
+    Whether a timestamp's second has passed, so it can serve as Last-Modified
+
+    Stored timestamps and HTTP dates have whole-second precision: a later write in the
+    same second would get the same Last-Modified, and clients revalidating with only
+    If-Modified-Since would be told their stale copy is current.
+    """
+    return last_modified is not None and datetime.utcnow() - last_modified.replace(microsecond=0) >= timedelta(seconds=1)
+
+def is_not_modified(etag, last_modified=None):
+    """Check the request's If-None-Match / If-Modified-Since against the current validators"""
+    if request.if_none_match:
+        # Weak comparison, since compressed responses carry weak ETags
+        return request.if_none_match.contains_weak(etag)
+
+    if request.if_modified_since and settled(last_modified):
+        # HTTP dates have whole-second precision
+        current = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return current <= request.if_modified_since
+
+    return False
+
+def conditional_json(etag, last_modified, build):
+    """
+    Return 304 Not Modified if the client already has this version, otherwise the JSON body
+
+    Args:
+        etag: Validator from make_etag
+        last_modified: Naive UTC datetime of the newest row in the response, or None;
+            only sent once its second has passed (see settled)
+        build: Callable returning the JSON-serializable body; only called on a miss
+
+    Returns:
+        Response with ETag, Last-Modified and revalidation Cache-Control headers
+    """
+    if is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+
+    response.set_etag(etag)
+    if settled(last_modified):
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Let browsers keep a copy but always revalidate it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+import logging
+import os
+import re
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_URL_PREFIX = '/static/uploads/'
+
+# Bounding box (px) of each responsive variant
+VARIANT_SIZES = {'thumb': 320, 'medium': 800}
+
+# Every variant is written in each of these formats: extension -> (Pillow format, save options)
+VARIANT_FORMATS = {
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4})
+}
+
+VARIANT_RE = re.compile(r'^(?P<stem>.+)_(?P<size>' + '|'.join(VARIANT_SIZES) + r')\.(?P<ext>'
+                        + '|'.join(VARIANT_FORMATS) + r')$')
+
+ORIGINAL_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif')
+
+def variant_filename(filename, size, ext):
+    """Filename of one variant of an uploaded image"""
+    stem = os.path.splitext(filename)[0]
+    return f'{stem}_{size}.{ext}'
+
+def image_variants(image_url):
+    """
+    URLs of the resized variants of an uploaded image
+
+    Derived from the URL alone, so serializing a menu never touches the disk. Variant
+    URLs are valid as soon as the upload is: until the pipeline has written a file,
+    the upload route answers with the original image.
+
+    Returns:
+        Dict of size -> {extension -> url}, or None for empty or external URLs
+    """
+    if not image_url or not image_url.startswith(UPLOAD_URL_PREFIX):
+        return None
+
+    filename = image_url[len(UPLOAD_URL_PREFIX):]
+    return {
+        size: {ext: UPLOAD_URL_PREFIX + variant_filename(filename, size, ext) for ext in VARIANT_FORMATS}
+        for size in VARIANT_SIZES
+    }
+
+def parse_variant(filename):
+    """Tuple of (stem, size, extension) if filename names a variant, else None"""
+    match = VARIANT_RE.match(filename)
+    return (match['stem'], match['size'], match['ext']) if match else None
+
+def find_original(upload_dir, stem):
+    """Filename of the original upload with this stem, or None"""
+    for ext in ORIGINAL_EXTENSIONS:
+        filename = f'{stem}.{ext}'
+        if os.path.exists(os.path.join(upload_dir, filename)):
+            return filename
+    return None
+
+def _flatten(image):
+    """RGB copy of an image, with any transparency composited onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+def _save_atomic(image, path, fmt, options):
+    """Write an image next to its final path and move it into place"""
+    partial = f'{path}.{uuid.uuid4().hex}.part'
+    image.save(partial, fmt, **options)
+    os.replace(partial, path)
+
+def process_image(path):
+    """
+    Normalize an uploaded image in place and write its resized variants
+
+    EXIF orientation is applied and all metadata (EXIF, GPS, comments) is dropped by
+    re-encoding the pixels. Animated GIFs keep their original file; their variants
+    are made from the first frame.
+    """
+    upload_dir, filename = os.path.split(path)
+
+    with Image.open(path) as source:
+        animated = getattr(source, 'is_animated', False)
+        source.load()
+        image = ImageOps.exif_transpose(source)
+
+        if not animated:
+            fmt = source.format
+            options = {'optimize': True}
+            if fmt == 'JPEG':
+                options.update(quality=90, progressive=True)
+            elif fmt == 'GIF' and 'transparency' in source.info:
+                options['transparency'] = source.info['transparency']
+            # Saving without exif/icc/comment parameters strips them
+            _save_atomic(image, path, fmt, options)
+
+    flat = _flatten(image)
+    for size, box in VARIANT_SIZES.items():
+        resized = flat.copy()
+        resized.thumbnail((box, box), Image.LANCZOS)
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            _save_atomic(resized, os.path.join(upload_dir, variant_filename(filename, size, ext)), fmt, options)
+
+class ImagePipeline:
+    """
+    Processes uploaded images on a local thread pool, off the request thread
+
+    Each original is queued at most once at a time; failures are logged and leave the
+    original in place, which the upload route keeps serving for missing variants.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self._pending = set()
+        self._failed = set()
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        """Create the worker pool for an application"""
+        app.config.setdefault('IMAGE_WORKERS', 2)
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config['IMAGE_WORKERS'],
+            thread_name_prefix='image-pipeline'
+        )
+        app.extensions['image_pipeline'] = self
+
+    def submit(self, path):
+        """Queue an original for processing unless it is already queued or known to fail"""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._pending or path in self._failed:
+                return None
+            self._pending.add(path)
+        return self.executor.submit(self._run, path)
+
+    def _run(self, path):
+        failed = False
+        try:
+            process_image(path)
+        except Exception:
+            failed = True
+            logger.exception('Failed to process image %s', path)
+
+        with self._lock:
+            self._pending.discard(path)
+            if failed:
+                self._failed.add(path)
+                self.failed += 1
+            else:
+                self.processed += 1
+
+    def stats(self):
+        """Processed/failed counters and queue length"""
+        with self._lock:
+            return {
+                'processed': self.processed,
+                'failed': self.failed,
+                'pending': len(self._pending)
+            }
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,222 @@
+from app.models.menu import Menu
+from app.models.cache_version import CacheVersion
+from app.services.menu_search import MenuSearchIndex, MenuSuggestIndex
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CachedMenu:
+    """Read-only snapshot of a menu row held by the catalog cache"""
+
+    __slots__ = ('id', 'name', 'description', 'price', 'category', 'image_url',
+                 'is_available', 'created_at', 'updated_at', '_data')
+
+    def __init__(self, menu):
+        for field in self.__slots__[:-1]:
+            setattr(self, field, getattr(menu, field))
+        # Serialized once at load time instead of on every request
+        self._data = menu.to_dict()
+
+    def to_dict(self):
+        return dict(self._data)
+
+class CatalogSnapshot:
+    """Immutable copy of the menu catalog at one version, with its lookup and search indexes"""
+
+    def __init__(self, version, menus):
+        by_category = {}
+        for menu in menus:
+            by_category.setdefault(menu.category, []).append(menu)
+
+        self.version = version
+        self.ordered = menus
+        self.by_id = {menu.id: menu for menu in menus}
+        self.by_category = by_category
+        self.search_index = MenuSearchIndex(menus)
+        self.suggest_index = MenuSuggestIndex(menus)
+        self.last_modified = max((menu.updated_at for menu in menus if menu.updated_at), default=None)
+
+    def get(self, menu_id):
+        """Menu by id, or None"""
+        return self.by_id.get(menu_id)
+
+    def list(self, category=None):
+        """Menus newest first, optionally limited to one category"""
+        if category:
+            return self.by_category.get(category, [])
+        return self.ordered
+
+    def search(self, query, category=None):
+        """Menus matching a full-text query, best match first"""
+        results = self.search_index.search(query)
+        if category:
+            results = [menu for menu in results if menu.category == category]
+        return results
+
+class MenuCatalogCache:
+    """
+    In-process copy of the menu catalog, indexed by id, by category and for full-text search
+
+    Menu writes bump the 'menus' row in cache_versions inside their transaction and
+    rebuild the local copy after committing. Other workers notice the new version on
+    their next check (at most MENU_CACHE_CHECK_SECONDS later) and reload the catalog.
+
+    Readers only ever take a reference to the current snapshot. Once the interval has
+    passed, the next reader checks the version (one single-row read on its own
+    connection) and rebuilds the catalog if it moved; other readers keep serving the
+    previous snapshot until the new one is swapped in. Callers whose correctness
+    depends on current menus (pricing an order, a menu's detail) pass fresh=True to
+    check on every call and wait for the rebuild.
+    """
+
+    VERSION_KEY = 'menus'
+
+    def __init__(self):
+        self.check_interval = 1.0
+        self._snapshot = None
+        self._checked_at = 0
+        # Held while rebuilding; only the first load and fresh readers wait on it
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Read the version check interval from the application config"""
+        self.check_interval = app.config.get('MENU_CACHE_CHECK_SECONDS', self.check_interval)
+        # A snapshot loaded for another app may come from another database
+        with self._reload_lock:
+            self._snapshot = None
+            self._checked_at = 0
+        app.extensions['menu_cache'] = self
+
+    def snapshot(self, fresh=False):
+        """
+        The current catalog snapshot
+
+        Checks the shared version at most every check_interval, or on every call with
+        fresh=True. A moved version is rebuilt in this thread; without fresh, a thread
+        that finds another one already rebuilding serves the previous snapshot instead of
+        waiting. Use one snapshot for all lookups of a request so they see the same version.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Nothing to serve yet: load the first snapshot in this thread
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._load(CacheVersion.current(self.VERSION_KEY))
+                return self._snapshot
+
+        if not fresh and time.monotonic() - self._checked_at < self.check_interval:
+            self._count(hit=True)
+            return snapshot
+
+        version = CacheVersion.current(self.VERSION_KEY)
+        if version == snapshot.version:
+            self._checked_at = time.monotonic()
+            self._count(hit=True)
+            return snapshot
+
+        if not self._reload_lock.acquire(blocking=fresh):
+            self._count(hit=True)
+            return snapshot
+        try:
+            # Another thread may have loaded this version while this one waited
+            if self._snapshot.version < version:
+                self._load(version)
+            return self._snapshot
+        finally:
+            self._reload_lock.release()
+
+    def refresh(self):
+        """
+        Reload the catalog now if its version changed
+
+        Menu writes call this after committing, so the writer's next read (from any
+        thread of this worker) already sees the change. A failed reload is logged and
+        left to the next read, since the write itself has already succeeded.
+        """
+        try:
+            return self.snapshot(fresh=True)
+        except Exception:
+            logger.exception('Failed to reload the menu catalog')
+            self._checked_at = 0
+            return self._snapshot
+
+    def _load(self, version):
+        """Build a snapshot of the catalog at this version and swap it in (reload lock held)"""
+        self._count(hit=False)
+        menus = [CachedMenu(menu) for menu in Menu.query.order_by(Menu.created_at.desc(), Menu.id.desc())]
+        snapshot = CatalogSnapshot(version, menus)
+
+        # A single reference assignment: readers see either the old or the new snapshot
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, menu_id):
+        """Cached menu by id, or None"""
+        return self.snapshot().get(menu_id)
+
+    def get_many(self, menu_ids):
+        """Dict of id -> cached menu for the ids that exist, checked against the shared version"""
+        by_id = self.snapshot(fresh=True).by_id
+        return {menu_id: by_id[menu_id] for menu_id in menu_ids if menu_id in by_id}
+
+    def list(self, category=None):
+        """Cached menus newest first, optionally limited to one category"""
+        return self.snapshot().list(category)
+
+    def search(self, query, category=None):
+        """Cached menus matching a full-text query, best match first"""
+        return self.snapshot().search(query, category)
+
+    def suggest(self, query, limit=10, available_only=False):
+        """Top cached menus for a partially typed, possibly misspelled name"""
+        return self.snapshot().suggest_index.suggest(query, limit, available_only)
+
+    def categories(self):
+        """Distinct categories present in the catalog"""
+        return list(self.snapshot().by_category)
+
+    def validators(self):
+        """(version, newest updated_at) of the cached catalog, for HTTP caching"""
+        snapshot = self.snapshot()
+        return snapshot.version, snapshot.last_modified
+
+    def invalidate(self):
+        """
+        Mark the catalog as changed
+
+        Call inside the transaction that writes menus, before commit, so the version bump
+        becomes visible to other workers together with the change itself; call refresh
+        after the commit.
+        """
+        CacheVersion.bump(self.VERSION_KEY)
+        # Make the next read check the version instead of waiting out the interval
+        self._checked_at = 0
+
+    def stats(self):
+        """Hit/miss counters and size of the cached catalog"""
+        snapshot = self._snapshot
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'version': snapshot.version if snapshot else None,
+            'menus': len(snapshot.by_id) if snapshot else 0,
+            'categories': len(snapshot.by_category) if snapshot else 0
+        }
+
+menu_cache = MenuCatalogCache()
@@ -0,0 +1,185 @@
+from app import db
+from app.models.menu import Menu
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+import csv
+import io
+
+# Rows written per multi-row INSERT / batched UPDATE
+IMPORT_BATCH_SIZE = 500
+
+IMPORT_FIELDS = ('id', 'name', 'description', 'price', 'category', 'image_url', 'is_available')
+
+# Same defaults as create_menu for optional columns missing from a new menu
+INSERT_DEFAULTS = {'description': '', 'image_url': '', 'is_available': True}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', ''}
+
+def parse_csv(text):
+    """
+    Parse CSV text with a header row into a list of dicts
+
+    Raises:
+        ValueError: If the header is missing or names unknown columns
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError('CSV header row is required')
+
+    header = [name.strip() for name in reader.fieldnames]
+    unknown = [name for name in header if name not in IMPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Allowed: {', '.join(IMPORT_FIELDS)}")
+    reader.fieldnames = header
+
+    # Empty cells mean "not given", like a missing JSON key
+    return [{key: value for key, value in row.items() if value not in (None, '')} for row in reader]
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError('is_available must be true or false')
+
+def validate_row(data):
+    """
+    Validate one imported menu and normalize it into column values
+
+    Returns:
+        Dict of the given column values (with 'id' only when an existing menu is targeted)
+
+    Raises:
+        ValueError: With the reason the row is rejected
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Each menu must be an object')
+
+    name = str(data.get('name') or '').strip()
+    category = str(data.get('category') or '').strip()
+    if not name or data.get('price') in (None, '') or not category:
+        raise ValueError('Name, price, and category are required')
+    if len(name) > 100:
+        raise ValueError('Name must be at most 100 characters')
+    if len(category) > 50:
+        raise ValueError('Category must be at most 50 characters')
+
+    try:
+        price = Decimal(str(data['price']))
+    except InvalidOperation:
+        raise ValueError('Price must be a number')
+    if not price.is_finite() or price <= 0:
+        raise ValueError('Price must be greater than 0')
+    if price >= Decimal('1e8'):
+        raise ValueError('Price is too large')
+
+    row = {
+        'name': name,
+        'price': price.quantize(Decimal('0.01')),
+        'category': category
+    }
+
+    # Optional columns are only written when given, so updates keep their current value
+    if 'description' in data:
+        row['description'] = str(data['description'] or '')
+    if 'image_url' in data:
+        row['image_url'] = str(data['image_url'] or '')
+        if len(row['image_url']) > 255:
+            raise ValueError('Image URL must be at most 255 characters')
+    if 'is_available' in data:
+        row['is_available'] = _parse_bool(data['is_available'])
+
+    if data.get('id') not in (None, ''):
+        try:
+            row['id'] = int(data['id'])
+        except (TypeError, ValueError):
+            raise ValueError('ID must be an integer')
+
+    return row
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), IMPORT_BATCH_SIZE):
+        yield values[start:start + IMPORT_BATCH_SIZE]
+
+def _existing_ids(rows):
+    """
+    Look up the menus an import touches, a batch of keys per query
+
+    Returns:
+        Tuple of (set of existing ids among the rows' ids, dict of (name, category) -> id)
+    """
+    known_ids = set()
+    for chunk in _chunks({row['id'] for row in rows if 'id' in row}):
+        known_ids.update(menu_id for menu_id, in db.session.query(Menu.id).filter(Menu.id.in_(chunk)))
+
+    by_key = {}
+    for chunk in _chunks({row['name'] for row in rows if 'id' not in row}):
+        query = db.session.query(Menu.id, Menu.name, Menu.category).filter(Menu.name.in_(chunk))
+        for menu_id, name, category in query.order_by(Menu.id):
+            by_key.setdefault((name, category), menu_id)
+
+    return known_ids, by_key
+
+def import_menus(records):
+    """
+    Validate and upsert many menus in the current transaction
+
+    Rows with an id update that menu; other rows update the menu with the same name
+    and category, or are inserted. All rows are validated in one pass before anything
+    is written; the caller commits (or rolls back).
+
+    Args:
+        records: List of dicts as sent by the client (JSON objects or CSV rows)
+
+    Returns:
+        Tuple of (created count, updated count, list of {'row', 'error'} dicts);
+        nothing is written when the error list is not empty
+    """
+    rows = []
+    errors = []
+    for number, data in enumerate(records, start=1):
+        try:
+            rows.append((number, validate_row(data)))
+        except ValueError as e:
+            errors.append({'row': number, 'error': str(e)})
+
+    known_ids, by_key = _existing_ids([row for _, row in rows])
+
+    inserts = []
+    updates = []
+    seen = {}
+    for number, row in rows:
+        if 'id' in row:
+            if row['id'] not in known_ids:
+                errors.append({'row': number, 'error': f"Menu with ID {row['id']} not found"})
+                continue
+            key = row['id']
+        else:
+            key = by_key.get((row['name'], row['category']), (row['name'], row['category']))
+            if not isinstance(key, tuple):
+                row['id'] = key
+
+        if key in seen:
+            errors.append({'row': number, 'error': f'Duplicate of row {seen[key]}'})
+            continue
+        seen[key] = number
+        (updates if 'id' in row else inserts).append(row)
+
+    if errors:
+        errors.sort(key=lambda error: error['row'])
+        return 0, 0, errors
+
+    now = datetime.utcnow()
+    for chunk in _chunks(inserts):
+        db.session.bulk_insert_mappings(Menu, [
+            dict(INSERT_DEFAULTS, **row, created_at=now, updated_at=now) for row in chunk
+        ])
+    for chunk in _chunks(updates):
+        db.session.bulk_update_mappings(Menu, [dict(row, updated_at=now) for row in chunk])
+
+    return len(inserts), len(updates), []
@@ -0,0 +1,373 @@
+from collections import Counter
+from itertools import chain
+import bisect
+import heapq
+import re
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Relative weight of a match in each searchable field
+FIELD_WEIGHTS = (('name', 3.0), ('category', 2.0), ('description', 1.0))
+
+# Score factor by how well an index token matches a query term
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+SUBSTRING_MATCH = 0.5
+FUZZY_MATCH = 0.5
+FUZZY_PENALTY = 0.1  # per extra edit beyond the first
+
+def tokenize(text):
+    """Lowercased word tokens of a piece of text"""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+def trigrams(token):
+    """Set of 3-character substrings of a token"""
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class MenuSearchIndex:
+    """
+    Inverted index over menu name, category and description
+
+    Query terms match index tokens exactly, by prefix (binary search over the sorted
+    vocabulary) or as a substring (trigram lookup). Every term must match; menus are
+    ranked by the summed field-weighted score, newest first on ties.
+    """
+
+    def __init__(self, menus):
+        postings = {}
+        for menu in menus:
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(getattr(menu, field)):
+                    entry = postings.setdefault(token, {})
+                    if weight > entry.get(menu.id, 0):
+                        entry[menu.id] = weight
+
+        grams = {}
+        for token in postings:
+            for gram in trigrams(token):
+                grams.setdefault(gram, set()).add(token)
+
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._trigrams = grams
+        self._menus = {menu.id: menu for menu in menus}
+        # Menus arrive newest first; position breaks score ties
+        self._position = {menu.id: i for i, menu in enumerate(menus)}
+
+    def _matching_tokens(self, term):
+        """Dict of index token -> match factor for one query term"""
+        matches = {}
+
+        vocabulary = self._vocabulary
+        i = bisect.bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            matches[vocabulary[i]] = EXACT_MATCH if vocabulary[i] == term else PREFIX_MATCH
+            i += 1
+
+        if len(term) >= 3:
+            candidates = set.intersection(*(self._trigrams.get(gram, set()) for gram in trigrams(term)))
+            for token in candidates:
+                if token not in matches and term in token:
+                    matches[token] = SUBSTRING_MATCH
+
+        return matches
+
+    def scores(self, query):
+        """Dict of menu id -> relevance score for menus matching every query term"""
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, factor in self._matching_tokens(term).items():
+                for menu_id, weight in self._postings[token].items():
+                    score = weight * factor
+                    if score > term_scores.get(menu_id, 0):
+                        term_scores[menu_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {menu_id: score + term_scores[menu_id]
+                          for menu_id, score in scores.items() if menu_id in term_scores}
+            if not scores:
+                return {}
+
+        return scores
+
+    def search(self, query):
+        """Menus matching query, best match first"""
+        scores = self.scores(query)
+        position = self._position
+        ranked = sorted(scores, key=lambda menu_id: (-scores[menu_id], position[menu_id]))
+        return [self._menus[menu_id] for menu_id in ranked]
+
+def padded_trigrams(token):
+    """Trigrams of a token padded at the start, so short and leading fragments still match"""
+    padded = f"  {token}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _osa_row(a, b, limit):
+    """
+    Last row of the optimal string alignment table of a against b
+
+    Entry j is the distance from a to b[:j], capped at limit + 1. Only the band of
+    cells within limit of the diagonal is computed. Returns None as soon as every
+    entry is known to exceed limit.
+    """
+    over = limit + 1
+    previous2 = None
+    previous = [min(j, over) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        current[0] = min(i, over)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = min(value, over)
+        if min(current) > limit:
+            return None
+        previous2, previous = previous, current
+    return previous
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+
+    Returns limit + 1 as soon as the distance is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    row = _osa_row(a, b, limit)
+    return limit + 1 if row is None else row[-1]
+
+def prefix_edit_distance(a, b, limit):
+    """Smallest distance from a to a beginning of b, or limit + 1 if it exceeds limit"""
+    row = _osa_row(a, b[:len(a) + limit], limit)
+    if row is None:
+        return limit + 1
+    return min(row[max(len(a) - limit, 1):])
+
+def allowed_typos(term):
+    """Edits tolerated for a query term of this length"""
+    if len(term) < 4:
+        return 0
+    if len(term) < 8:
+        return 1
+    return 2
+
+class MenuSuggestIndex:
+    """
+    Search-as-you-type index over menu names
+
+    Each query term matches name tokens exactly, by prefix, or within a small edit
+    distance (so "gorneg" still finds "Goreng"); the last term is treated as an
+    unfinished prefix. Fuzzy candidates come from a padded-trigram index so only
+    tokens sharing enough fragments with the term are compared.
+
+    Work per query is bounded rather than proportional to the catalog. A term expands
+    to at most MAX_EXPANSIONS prefix tokens (those holding the best-ranked menus) and
+    MAX_FUZZY_CANDIDATES edit-distance checks, and typos are only looked up when exact
+    and prefix matches don't fill the list. Menus are drawn from the rarest term's
+    postings in rank order, narrowed by set intersections with the other terms, and the
+    scan stops once no later menu can enter the top results or after MAX_CANDIDATES
+    menus. Only the fuzzy tail is approximate: past the caps a closer typo match can be
+    missed in favour of a fragment-sharing one.
+    """
+
+    MAX_EXPANSIONS = 64
+    MAX_FUZZY_CANDIDATES = 64
+    MAX_CANDIDATES = 2000
+    # Other terms with more postings than this are checked per candidate instead of
+    # being intersected up front
+    MAX_FILTER_POSTINGS = 10000
+
+    def __init__(self, menus):
+        # Rank is the tie-break order: shorter names first, then newest first
+        ranked = sorted(range(len(menus)), key=lambda i: (len(menus[i].name), i))
+        self._menus = [menus[i] for i in ranked]
+        self._name_tokens = [frozenset(tokenize(menu.name)) for menu in self._menus]
+
+        postings = {}
+        for rank, tokens in enumerate(self._name_tokens):
+            for token in tokens:
+                postings.setdefault(token, []).append(rank)
+
+        grams = {}
+        short_prefixes = {}
+        for token in postings:
+            for gram in padded_trigrams(token):
+                grams.setdefault(gram, []).append(token)
+            for length in (1, 2):
+                if len(token) > length:
+                    short_prefixes.setdefault(token[:length], []).append(token)
+
+        # Postings are in rank order, so a token's first entry is its best menu
+        for prefix, tokens in short_prefixes.items():
+            short_prefixes[prefix] = heapq.nsmallest(self.MAX_EXPANSIONS, tokens,
+                                                     key=lambda token: postings[token][0])
+
+        self._postings = postings
+        self._posting_sets = {token: frozenset(ranks) for token, ranks in postings.items()}
+        self._vocabulary = sorted(postings)
+        self._trigrams = grams
+        self._short_prefixes = short_prefixes
+
+    def _prefix_tokens(self, term):
+        """Tokens longer than term that start with it, at most MAX_EXPANSIONS of them"""
+        if len(term) < 3:
+            return self._short_prefixes.get(term, [])
+
+        vocabulary = self._vocabulary
+        start = bisect.bisect_right(vocabulary, term)
+        end = bisect.bisect_left(vocabulary, term[:-1] + chr(ord(term[-1]) + 1), start)
+        tokens = vocabulary[start:end]
+        if len(tokens) > self.MAX_EXPANSIONS:
+            postings = self._postings
+            tokens = heapq.nsmallest(self.MAX_EXPANSIONS, tokens, key=lambda token: postings[token][0])
+        return tokens
+
+    def _token_scores(self, term, is_prefix, fuzzy=True):
+        """
+        Match scores of the name tokens one query term matches
+
+        Returns:
+            Tuple of a dict of name token -> match score, and whether the prefix
+            expansion hit MAX_EXPANSIONS (so further tokens starting with term exist)
+        """
+        scores = {}
+        capped = False
+        if term in self._postings:
+            scores[term] = EXACT_MATCH
+        if is_prefix:
+            tokens = self._prefix_tokens(term)
+            capped = len(tokens) == self.MAX_EXPANSIONS
+            for token in tokens:
+                scores[token] = PREFIX_MATCH
+
+        limit = allowed_typos(term) if fuzzy else 0
+        if limit:
+            term_grams = padded_trigrams(term)
+            shared = Counter(chain.from_iterable(self._trigrams.get(gram, ()) for gram in term_grams))
+
+            # Each edit changes the length by at most one and destroys at most four of the
+            # term's trigrams (a transposition)
+            needed = len(term_grams) - 4 * limit
+            shortest = len(term) - limit
+            longest = len(term) + limit if not is_prefix else float('inf')
+            candidates = [
+                token for token, count in shared.items()
+                if count >= needed and shortest <= len(token) <= longest and token not in scores
+            ]
+            if len(candidates) > self.MAX_FUZZY_CANDIDATES:
+                # Most shared trigrams first, then the tokens holding the best-ranked menus
+                postings = self._postings
+                candidates = heapq.nsmallest(self.MAX_FUZZY_CANDIDATES, candidates,
+                                             key=lambda token: (-shared[token], postings[token][0]))
+
+            for token in candidates:
+                if is_prefix:
+                    # While typing, compare against the token's beginnings of similar length
+                    distance = prefix_edit_distance(term, token, limit)
+                else:
+                    distance = edit_distance(term, token, limit)
+                if distance <= limit:
+                    scores[token] = FUZZY_MATCH - FUZZY_PENALTY * (distance - 1)
+
+        return scores, capped
+
+    def suggest(self, query, limit=10, available_only=False):
+        """Top menus for a partially typed, possibly misspelled name"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        # A menu matched without typos scores at least len(terms) - 0.2 and one needing a
+        # fuzzy match at most len(terms) - 0.5, so typos are only looked up when the
+        # exact and prefix matches don't fill the list
+        last = len(terms) - 1
+        matches = [self._token_scores(term, index == last, fuzzy=False) for index, term in enumerate(terms)]
+        menus = self._rank(terms, matches, limit, available_only)
+        if len(menus) == limit:
+            return menus
+
+        matches = [self._token_scores(term, index == last) for index, term in enumerate(terms)]
+        return self._rank(terms, matches, limit, available_only)
+
+    def _rank(self, terms, matches, limit, available_only):
+        """Top menus matching every term, by summed score then rank"""
+        if not all(scores for scores, capped in matches):
+            return []
+
+        # A capped prefix term can't drive or filter: tokens past the cap also match.
+        # It is checked on each candidate's name tokens instead.
+        postings = self._postings
+        sizes = [float('inf') if capped else sum(len(postings[token]) for token in scores)
+                 for scores, capped in matches]
+        driver = min(range(len(terms)), key=sizes.__getitem__)
+        others = [(scores, terms[index] if capped else None)
+                  for index, (scores, capped) in enumerate(matches) if index != driver]
+        others_best = sum(max(PREFIX_MATCH if prefix else 0, *scores.values()) for scores, prefix in others)
+
+        # Narrow the candidates with set intersections of the selective terms' postings
+        allowed = None
+        for index in sorted(range(len(terms)), key=sizes.__getitem__):
+            if index != driver and sizes[index] <= self.MAX_FILTER_POSTINGS:
+                matching = [self._posting_sets[token] for token in matches[index][0]]
+                matching = matching[0] if len(matching) == 1 else frozenset().union(*matching)
+                allowed = matching if allowed is None else allowed & matching
+                if not allowed:
+                    return []
+
+        groups = {}
+        for token, score in matches[driver][0].items():
+            groups.setdefault(score, []).append(postings[token])
+        if allowed is not None:
+            groups = {score: [sorted(allowed.intersection(chain.from_iterable(lists)))]
+                      for score, lists in groups.items()}
+
+        menus = self._menus
+        name_tokens = self._name_tokens
+        best = []  # heap of (score, -rank), worst result on top
+        seen = set()
+        examined = 0
+        for group_score in sorted(groups, reverse=True):
+            bound = group_score + others_best
+            # Menus in this and later groups score at most bound; ties go to lower ranks
+            if len(best) == limit and best[0][0] > bound:
+                break
+            for rank in heapq.merge(*groups[group_score]):
+                if len(best) == limit and best[0] > (bound, -rank):
+                    break
+                if rank in seen:
+                    continue
+                seen.add(rank)
+                if available_only and not menus[rank].is_available:
+                    continue
+                examined += 1
+                if examined > self.MAX_CANDIDATES:
+                    break
+
+                score = group_score
+                tokens = name_tokens[rank]
+                for scores, prefix in others:
+                    term_best = max((scores.get(token, 0) for token in tokens), default=0)
+                    if prefix is not None and term_best < PREFIX_MATCH \
+                            and any(token.startswith(prefix) for token in tokens):
+                        term_best = PREFIX_MATCH
+                    if not term_best:
+                        break
+                    score += term_best
+                else:
+                    if len(best) < limit:
+                        heapq.heappush(best, (score, -rank))
+                    elif (score, -rank) > best[0]:
+                        heapq.heapreplace(best, (score, -rank))
+            if examined > self.MAX_CANDIDATES:
+                break
+
+        return [menus[-negative_rank] for score, negative_rank in sorted(best, reverse=True)]
@@ -0,0 +1,194 @@
+from collections import deque
+import json
+import threading
+import time
+
+class Subscriber:
+    """
+    One connected client: a bounded queue of pending events
+
+    A client that falls behind by more than max_pending events loses its queue and
+    is told to resync (reload its data) instead of blocking publishers.
+    """
+
+    def __init__(self, max_pending):
+        self.max_pending = max_pending
+        self._events = deque()
+        self._resync = False
+        self._ready = threading.Condition()
+
+    def push(self, event):
+        """Queue an event; returns True if this overflowed the queue"""
+        with self._ready:
+            overflowed = False
+            if len(self._events) >= self.max_pending:
+                self._events.clear()
+                self._resync = overflowed = True
+            elif not self._resync:
+                self._events.append(event)
+            self._ready.notify()
+            return overflowed
+
+    def request_resync(self):
+        """Drop pending events and tell the client to reload"""
+        with self._ready:
+            self._events.clear()
+            self._resync = True
+            self._ready.notify()
+
+    def get(self, timeout):
+        """
+        Wait up to timeout seconds for work
+
+        Returns:
+            List of events, the string 'resync', or an empty list on timeout
+        """
+        with self._ready:
+            if not self._events and not self._resync:
+                self._ready.wait(timeout)
+            if self._resync:
+                self._resync = False
+                return 'resync'
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+class OrderEventBroker:
+    """
+    In-process fan-out of order change events to Server-Sent Event streams
+
+    Every event gets an id of the form "<epoch>-<sequence>"; the epoch changes whenever
+    the process restarts, so a client resuming with a Last-Event-ID from another
+    process (or one that has left the replay history) is told to resync.
+    """
+
+    def __init__(self, max_pending=100, history_size=500, max_clients=0):
+        self.max_pending = max_pending
+        self.max_clients = max_clients
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.published = 0
+        self.resyncs = 0
+        self.rejected = 0
+
+    def init_app(self, app):
+        """Read queue and client limits from the application config"""
+        app.config.setdefault('ORDER_EVENTS_HEARTBEAT_SECONDS', 15)
+        self.max_pending = app.config.get('ORDER_EVENTS_MAX_PENDING', self.max_pending)
+        self.max_clients = app.config.get('ORDER_EVENTS_MAX_CLIENTS', self.max_clients)
+        history_size = app.config.get('ORDER_EVENTS_HISTORY', self._history.maxlen)
+        if history_size != self._history.maxlen:
+            self._history = deque(self._history, maxlen=history_size)
+        app.extensions['order_events'] = self
+
+    def publish(self, event_type, data):
+        """
+        Send an event to every connected client
+
+        Call after the change is committed, so clients never see rolled back writes.
+        """
+        # Encoded once, however many clients are connected
+        payload = json.dumps(data)
+        with self._lock:
+            self._sequence += 1
+            event = (f'{self.epoch}-{self._sequence}', event_type, payload)
+            self._history.append(event)
+            self.published += 1
+            subscribers = list(self._subscribers)
+
+        overflowed = sum(subscriber.push(event) for subscriber in subscribers)
+        if overflowed:
+            with self._lock:
+                self.resyncs += overflowed
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a client, replaying events it missed since last_event_id
+
+        Each stream holds a server thread (or greenlet) for as long as it is open, so
+        at most max_clients streams are accepted per process (0 means no limit).
+
+        Returns:
+            Subscriber to read events from, or None if the process is at max_clients;
+            pass it to unsubscribe when done
+        """
+        subscriber = Subscriber(self.max_pending)
+        with self._lock:
+            if self.max_clients and len(self._subscribers) >= self.max_clients:
+                self.rejected += 1
+                return None
+            self._subscribers.add(subscriber)
+            if last_event_id:
+                missed = self._missed_since(last_event_id)
+                if missed is None:
+                    self.resyncs += 1
+                    subscriber.request_resync()
+                else:
+                    for event in missed:
+                        if subscriber.push(event):
+                            self.resyncs += 1
+        return subscriber
+
+    def last_event_id(self):
+        """Id of the most recently published event"""
+        with self._lock:
+            return f'{self.epoch}-{self._sequence}'
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _missed_since(self, last_event_id):
+        """Events after last_event_id, or None if they can't be replayed"""
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+
+        sequence = int(sequence)
+        history = list(self._history)
+        if history and int(history[0][0].partition('-')[2]) > sequence + 1:
+            # Some events in between have already left the history
+            return None
+        return [event for event in history if int(event[0].partition('-')[2]) > sequence]
+
+    def stats(self):
+        """Connected clients and event counters"""
+        with self._lock:
+            return {
+                'clients': len(self._subscribers),
+                'max_clients': self.max_clients,
+                'rejected': self.rejected,
+                'published': self.published,
+                'resyncs': self.resyncs,
+                'history': len(self._history)
+            }
+
+def format_event(event_id, event_type, payload):
+    """Encode one event (with its JSON-encoded data) in the text/event-stream wire format"""
+    return f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
+
+def event_stream(broker, subscriber, heartbeat_seconds, retry_ms=3000):
+    """
+    Yield a client's Server-Sent Events until it disconnects
+
+    Comment lines are sent as heartbeats so proxies keep the connection open and
+    dead clients are noticed on the next write.
+    """
+    try:
+        yield f'retry: {retry_ms}\n\n'
+        while True:
+            events = subscriber.get(heartbeat_seconds)
+            if events == 'resync':
+                # Clients reload their data; the resync's own id lets them resume afterwards
+                yield format_event(broker.last_event_id(), 'resync', '{}')
+            elif events:
+                yield ''.join(format_event(*event) for event in events)
+            else:
+                yield ': keepalive\n\n'
+    finally:
+        broker.unsubscribe(subscriber)
+
+order_events = OrderEventBroker()
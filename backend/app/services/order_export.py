@@ -0,0 +1,169 @@
+from app.models.order import Order
+from app.services.pagination import iter_keyset
+from app.services.serialization import order_item_values, order_rows_query
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional dependency; columnar formats fall back to CSV
+    pyarrow = None
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet', 'arrow')
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Header for the ORDER_COLUMNS of each row; the order id is prefixed to tell it apart from item_id
+ORDER_EXPORT_COLUMNS = ('order_id', 'customer_name', 'status', 'total_amount', 'notes', 'created_at', 'updated_at')
+
+# Header for the order_item_values tuples
+ITEM_EXPORT_COLUMNS = ('item_id', 'menu_id', 'menu_name', 'quantity', 'price', 'subtotal')
+
+def columnar_available():
+    """Whether Parquet / Arrow IPC output is possible (pyarrow installed)"""
+    return pyarrow is not None
+
+def parse_date_range(start_date, end_date):
+    """
+    Parse YYYY-MM-DD bounds into a half-open created_at range
+
+    Returns:
+        Tuple of (start, end) datetimes; end is the day after end_date so that
+        whole day is included. Missing bounds are None.
+
+    Raises:
+        ValueError: If a date is malformed or the range is reversed
+    """
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1) if end_date else None
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format')
+
+    if start and end and start >= end:
+        raise ValueError('start_date must not be after end_date')
+    return start, end
+
+def export_query(status='', start=None, end=None):
+    """Projected order query for an export, filtered by status and created_at range [start, end)"""
+    query = order_rows_query()
+    if status:
+        query = query.filter(Order.status == status)
+    if start:
+        query = query.filter(Order.created_at >= start)
+    if end:
+        query = query.filter(Order.created_at < end)
+    return query
+
+def iter_export_rows(query, with_items, batch_size):
+    """
+    Yield batches of flat export rows, fetching orders (and items) one keyset batch at a time
+
+    With items, each order contributes one row per item (order columns repeated), or one
+    row with empty item columns if it has none.
+    """
+    for orders in iter_keyset(query, Order, batch_size):
+        if not with_items:
+            yield [tuple(order) for order in orders]
+            continue
+
+        items = order_item_values([order.id for order in orders])
+        batch = []
+        for order in orders:
+            order_items = items[order.id] or [(None,) * len(ITEM_EXPORT_COLUMNS)]
+            for item in order_items:
+                batch.append(tuple(order) + item)
+        yield batch
+
+def export_columns(with_items):
+    """Header of the flat export rows"""
+    return ORDER_EXPORT_COLUMNS + ITEM_EXPORT_COLUMNS if with_items else ORDER_EXPORT_COLUMNS
+
+def _text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def stream_csv(batches, columns):
+    """Yield CSV text chunk by chunk, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for batch in batches:
+        writer.writerows([_text(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_ndjson(batches, columns):
+    """Yield one JSON object per row, one chunk per batch"""
+    for batch in batches:
+        yield ''.join(
+            json.dumps({name: _json_value(value) for name, value in zip(columns, row)}) + '\n'
+            for row in batch
+        )
+
+def _json_value(value):
+    if value is None or isinstance(value, (int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    # Decimal money values keep their exact digits
+    return str(value)
+
+def _arrow_schema(with_items):
+    money = pyarrow.decimal128(12, 2)
+    fields = [
+        ('order_id', pyarrow.int64()),
+        ('customer_name', pyarrow.string()),
+        ('status', pyarrow.string()),
+        ('total_amount', money),
+        ('notes', pyarrow.string()),
+        ('created_at', pyarrow.timestamp('us')),
+        ('updated_at', pyarrow.timestamp('us'))
+    ]
+    if with_items:
+        fields += [
+            ('item_id', pyarrow.int64()),
+            ('menu_id', pyarrow.int64()),
+            ('menu_name', pyarrow.string()),
+            ('quantity', pyarrow.int64()),
+            ('price', money),
+            ('subtotal', money)
+        ]
+    return pyarrow.schema(fields)
+
+def write_columnar(batches, with_items, fmt, output):
+    """
+    Write batches as Parquet (one row group per batch) or Arrow IPC stream into output
+
+    Both formats need their footer/schema written around the data, so the caller
+    provides a (spooled) file and streams it once complete.
+    """
+    schema = _arrow_schema(with_items)
+    if fmt == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(output, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_stream(output, schema)
+
+    try:
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [[] for _ in schema]
+            writer.write_batch(pyarrow.record_batch(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+    finally:
+        writer.close()
+
+    output.seek(0)
+    return output
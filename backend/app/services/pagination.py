@@ -0,0 +1,135 @@
+from sqlalchemy import and_, or_
+from datetime import datetime
+import base64
+import json
+
+def encode_cursor(row, direction):
+    """Encode the (created_at, id) position of a row as an opaque cursor string"""
+    payload = json.dumps([row.created_at.isoformat(), row.id, direction])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        Tuple of (created_at, id, direction)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(row_id), direction
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def keyset_paginate(query, model, cursor, per_page):
+    """
+    Paginate a query newest-first by (created_at, id) without OFFSET or COUNT(*)
+
+    Args:
+        query: Unordered query over model
+        model: Mapped class with created_at and id columns
+        cursor: Cursor from a previous page, or empty for the first page
+        per_page: Number of rows per page
+
+    Returns:
+        Tuple of (rows, next_cursor, prev_cursor); missing cursors are None
+    """
+    direction = 'next'
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        if direction == 'next':
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > row_id)
+            ))
+
+    if direction == 'next':
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(per_page + 1).all()
+    return _page(rows, per_page, direction, cursor)
+
+def keyset_paginate_list(rows, cursor, per_page):
+    """
+    Paginate an in-memory list the way keyset_paginate paginates a query
+
+    Args:
+        rows: Objects with created_at and id, sorted newest-first by (created_at, id)
+        cursor: Cursor from a previous page, or empty for the first page
+        per_page: Number of rows per page
+
+    Returns:
+        Tuple of (rows, next_cursor, prev_cursor); missing cursors are None
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    direction = 'next'
+    start, end = 0, len(rows)
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        # Binary search for the first row at or past the cursor position
+        key = (created_at, row_id)
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            if (rows[middle].created_at, rows[middle].id) > key:
+                low = middle + 1
+            else:
+                high = middle
+        if direction == 'next':
+            start = low
+            if low < len(rows) and (rows[low].created_at, rows[low].id) == key:
+                start += 1
+        else:
+            end = low
+
+    if direction == 'next':
+        page = rows[start:start + per_page + 1]
+    else:
+        page = rows[max(end - per_page - 1, 0):end][::-1]
+    return _page(page, per_page, direction, cursor)
+
+def _page(rows, per_page, direction, cursor):
+    """Trim a page fetched with one extra row (in fetch order) and build its cursors"""
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'prev':
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    next_cursor = encode_cursor(rows[-1], 'next') if rows and has_next else None
+    prev_cursor = encode_cursor(rows[0], 'prev') if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
+
+def iter_keyset(query, model, batch_size):
+    """
+    Iterate a query newest-first in batches, each fetched with its own keyset query
+
+    Unlike yield_per, no server-side cursor stays open between batches, so other
+    queries (eager loads, item lookups) can run on the same connection meanwhile.
+    """
+    cursor = ''
+    while True:
+        rows, cursor, _ = keyset_paginate(query, model, cursor, batch_size)
+        if rows:
+            yield rows
+        if not cursor:
+            return
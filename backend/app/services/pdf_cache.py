@@ -0,0 +1,75 @@
+from collections import OrderedDict
+import threading
+
+class PDFCache:
+    """
+    Size-bounded in-memory LRU cache for rendered PDF documents
+
+    Keys are content addresses built from whatever determines the document (e.g. order
+    id and updated_at), so entries never need explicit invalidation; stale versions
+    simply stop being requested and age out.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Read cache limits from the application config"""
+        self.max_bytes = app.config.get('PDF_CACHE_MAX_BYTES', self.max_bytes)
+        self.max_entry_bytes = app.config.get('PDF_CACHE_MAX_ENTRY_BYTES', self.max_entry_bytes)
+        app.extensions['pdf_cache'] = self
+
+    def get(self, key):
+        """Return cached PDF bytes for key, or None on a miss"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """Store PDF bytes under key, evicting least recently used entries to fit"""
+        if len(data) > self.max_entry_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes
+            }
+
+pdf_cache = PDFCache()
@@ -7,56 +7,105 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
 import io
 
-class OrderPDFService:
-    """Service for generating PDF reports from order data"""
+def build_styles():
+    """Build the sample stylesheet plus the custom styles used by the PDFs"""
+    styles = getSampleStyleSheet()
     
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-    
-    def setup_custom_styles(self):
-        """Setup custom styles for the PDF"""
+    return {
+        'sample': styles,
+        
         # Title style
-        self.title_style = ParagraphStyle(
+        'title': ParagraphStyle(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
             spaceAfter=30,
             alignment=TA_CENTER,
             textColor=colors.HexColor('#F37F0C')  # Primary orange color
-        )
+        ),
         
         # Subtitle style
-        self.subtitle_style = ParagraphStyle(
+        'subtitle': ParagraphStyle(
             'CustomSubtitle',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=14,
             spaceAfter=20,
             alignment=TA_CENTER,
             textColor=colors.HexColor('#666666')
-        )
+        ),
         
         # Normal style for body text
-        self.body_style = ParagraphStyle(
+        'body': ParagraphStyle(
             'CustomBody',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             spaceAfter=12
+        ),
+        
+        # Report footer
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            alignment=TA_CENTER,
+            textColor=colors.grey
         )
+    }
+
+# Built once per process instead of on every OrderPDFService()
+SHARED_STYLES = build_styles()
+
+class FlowableStream(list):
+    """
+    Story list that is filled lazily from an iterator of flowables
+    
+    reportlab's build loop only looks at the front of the story, so topping the list
+    up on each len() check keeps just a few flowables in memory at a time.
+    """
     
-    def generate_orders_pdf(self, orders, filename=None):
+    def __init__(self, flowables, lookahead=4):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+    
+    def __len__(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+class OrderPDFService:
+    """Service for generating PDF reports from order data"""
+    
+    # Orders per table chunk in the bulk report, roughly one page of rows
+    ROWS_PER_TABLE = 25
+    
+    def __init__(self):
+        # Styles are never mutated after creation, so all instances share one set
+        self.styles = SHARED_STYLES['sample']
+        self.title_style = SHARED_STYLES['title']
+        self.subtitle_style = SHARED_STYLES['subtitle']
+        self.body_style = SHARED_STYLES['body']
+        self.footer_style = SHARED_STYLES['footer']
+    
+    def generate_orders_pdf(self, orders, filename=None, summary=None, output=None):
         """
         Generate a PDF report containing all orders
         
         Args:
-            orders: List of order objects with their items
+            orders: List or iterator of order objects with their items
             filename: Optional filename for the PDF
+            summary: Optional precomputed summary statistics (see summarize_orders);
+                required when orders is an iterator so it is only consumed once
+            output: Optional writable file object to render into instead of a BytesIO
             
         Returns:
-            BytesIO buffer containing the PDF data
+            Buffer (or the given output file) containing the PDF data, rewound to the start
         """
         # Create a BytesIO buffer to hold the PDF
-        buffer = io.BytesIO()
+        buffer = output if output is not None else io.BytesIO()
         
         # Create the PDF document
         if filename is None:
@@ -71,33 +120,45 @@ class OrderPDFService:
             bottomMargin=18
         )
         
-        # Container for the PDF elements
-        elements = []
+        if summary is None:
+            summary = self.summarize_orders(orders)
+        
+        # Build the PDF, pulling order tables from the iterator as pages are laid out
+        doc.build(FlowableStream(self._orders_report_elements(orders, summary)))
         
+        # Get the value of the BytesIO buffer
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def summarize_orders(orders):
+        """Compute report summary statistics from a list of orders"""
+        return {
+            'total_orders': len(orders),
+            'total_revenue': sum(float(order.total_amount or 0) for order in orders),
+            'pending_orders': len([o for o in orders if o.status == 'pending']),
+            'completed_orders': len([o for o in orders if o.status == 'completed']),
+            'cancelled_orders': len([o for o in orders if o.status == 'cancelled'])
+        }
+    
+    def _orders_report_elements(self, orders, summary):
+        """Yield the flowables of the orders report in document order"""
         # Add title
-        title = Paragraph("Restaurant Orders Report", self.title_style)
-        elements.append(title)
+        yield Paragraph("Restaurant Orders Report", self.title_style)
         
         # Add generation date
         date_text = f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
-        date_para = Paragraph(date_text, self.subtitle_style)
-        elements.append(date_para)
-        elements.append(Spacer(1, 20))
+        yield Paragraph(date_text, self.subtitle_style)
+        yield Spacer(1, 20)
         
         # Add summary statistics
-        total_orders = len(orders)
-        total_revenue = sum(float(order.total_amount or 0) for order in orders)
-        pending_orders = len([o for o in orders if o.status == 'pending'])
-        completed_orders = len([o for o in orders if o.status == 'completed'])
-        cancelled_orders = len([o for o in orders if o.status == 'cancelled'])
-        
         summary_data = [
             ['Summary Statistics', ''],
-            ['Total Orders', str(total_orders)],
-            ['Total Revenue', f"Rp {total_revenue:,.0f}"],
-            ['Pending Orders', str(pending_orders)],
-            ['Completed Orders', str(completed_orders)],
-            ['Cancelled Orders', str(cancelled_orders)]
+            ['Total Orders', str(summary['total_orders'])],
+            ['Total Revenue', f"Rp {summary['total_revenue']:,.0f}"],
+            ['Pending Orders', str(summary['pending_orders'])],
+            ['Completed Orders', str(summary['completed_orders'])],
+            ['Cancelled Orders', str(summary['cancelled_orders'])]
         ]
         
         summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
@@ -114,88 +175,86 @@ class OrderPDFService:
             ('FONTSIZE', (0, 1), (-1, -1), 10),
         ]))
         
-        elements.append(summary_table)
-        elements.append(Spacer(1, 30))
+        yield summary_table
+        yield Spacer(1, 30)
         
-        # Add orders table
-        if orders:
+        # Add orders tables
+        if summary['total_orders']:
             # Orders header
-            orders_title = Paragraph("Order Details", self.styles['Heading2'])
-            elements.append(orders_title)
-            elements.append(Spacer(1, 10))
-            
-            # Create table data
-            table_data = [
-                ['Order ID', 'Customer', 'Status', 'Items', 'Total', 'Date']
-            ]
+            yield Paragraph("Order Details", self.styles['Heading2'])
+            yield Spacer(1, 10)
             
+            # Emit one small table per chunk of orders so only a page or so of rows is held at once
+            table_data = []
             for order in orders:
-                # Format order items
-                items_text = []
-                for item in order.order_items:
-                    items_text.append(f"{item.menu.name} (x{item.quantity})")
-                items_str = "\n".join(items_text) if items_text else "No items"
-                
-                # Format date
-                date_str = order.created_at.strftime('%m/%d/%Y') if order.created_at else ''
-                
-                # Status styling
-                status_display = order.status.title()
-                
-                table_data.append([
-                    str(order.id),
-                    order.customer_name,
-                    status_display,
-                    items_str,
-                    f"Rp {float(order.total_amount or 0):,.0f}",
-                    date_str
-                ])
-            
-            # Create and style the table
-            orders_table = Table(table_data, colWidths=[0.7*inch, 1.5*inch, 1*inch, 2.5*inch, 1*inch, 1*inch])
-            orders_table.setStyle(TableStyle([
-                # Header styling
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#F37F0C')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                
-                # Data rows styling
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                
-                # Alternate row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ]))
+                table_data.append(self._order_row(order))
+                if len(table_data) == self.ROWS_PER_TABLE:
+                    yield self._orders_table(table_data)
+                    table_data = []
             
-            elements.append(orders_table)
+            if table_data:
+                yield self._orders_table(table_data)
         else:
-            no_orders = Paragraph("No orders found.", self.body_style)
-            elements.append(no_orders)
+            yield Paragraph("No orders found.", self.body_style)
         
         # Add footer
-        elements.append(Spacer(1, 30))
+        yield Spacer(1, 30)
         footer_text = "This report was automatically generated by the Restaurant Management System."
-        footer = Paragraph(footer_text, ParagraphStyle(
-            'Footer',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        ))
-        elements.append(footer)
+        yield Paragraph(footer_text, self.footer_style)
+    
+    def _order_row(self, order):
+        """Format one order as a row of the orders table"""
+        # Format order items
+        items_text = []
+        for item in order.order_items:
+            items_text.append(f"{item.menu.name} (x{item.quantity})")
+        items_str = "\n".join(items_text) if items_text else "No items"
         
-        # Build the PDF
-        doc.build(elements)
+        # Format date
+        date_str = order.created_at.strftime('%m/%d/%Y') if order.created_at else ''
         
-        # Get the value of the BytesIO buffer
-        buffer.seek(0)
-        return buffer
+        # Status styling
+        status_display = order.status.title()
+        
+        return [
+            str(order.id),
+            order.customer_name,
+            status_display,
+            items_str,
+            f"Rp {float(order.total_amount or 0):,.0f}",
+            date_str
+        ]
+    
+    def _orders_table(self, rows):
+        """Create a styled orders table with a header row for a chunk of order rows"""
+        table_data = [['Order ID', 'Customer', 'Status', 'Items', 'Total', 'Date']] + rows
+        
+        orders_table = Table(
+            table_data,
+            colWidths=[0.7*inch, 1.5*inch, 1*inch, 2.5*inch, 1*inch, 1*inch],
+            repeatRows=1
+        )
+        orders_table.setStyle(TableStyle([
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#F37F0C')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            
+            # Data rows styling
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            
+            # Alternate row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]))
+        
+        return orders_table
     
     def generate_single_order_pdf(self, order, filename=None):
         """
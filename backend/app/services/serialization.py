@@ -0,0 +1,136 @@
+from flask.json.provider import DefaultJSONProvider
+from app import db
+from app.models.order import Order, OrderItem
+from app.models.menu import Menu
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed
+
+    Values orjson can't handle natively (Decimal, dates) go through Flask's default
+    conversion, so the output matches the stdlib provider apart from key order.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+def parse_fields(raw, allowed):
+    """
+    Parse a sparse fieldset parameter like 'id,name,price'
+
+    Returns:
+        Tuple of requested field names, or None when no fieldset was given
+
+    Raises:
+        ValueError: If a requested field is not in allowed
+    """
+    if not raw:
+        return None
+
+    fields = tuple(field.strip() for field in raw.split(',') if field.strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+def select_fields(data, fields):
+    """Restrict a serialized dict to a sparse fieldset (None keeps everything)"""
+    if fields is None:
+        return data
+    return {field: data[field] for field in fields}
+
+def iso(value):
+    """ISO 8601 string for a datetime column value"""
+    return value.isoformat() if value else None
+
+ORDER_FIELDS = ('id', 'customer_name', 'status', 'total_amount', 'notes', 'created_at', 'updated_at', 'order_items')
+
+# Columns selected for read-only order lists; rows come back as plain tuples, not Order objects
+ORDER_COLUMNS = (
+    Order.id,
+    Order.customer_name,
+    Order.status,
+    Order.total_amount,
+    Order.notes,
+    Order.created_at,
+    Order.updated_at
+)
+
+def order_rows_query():
+    """Query selecting ORDER_COLUMNS, filterable and orderable like Order.query"""
+    return db.session.query(*ORDER_COLUMNS)
+
+def order_item_values(order_ids):
+    """
+    Fetch the items of many orders in one projected query
+
+    Returns:
+        Dict of order id -> list of (item id, menu id, menu name, quantity, price, subtotal)
+        tuples in id order, with money values as exact Decimals
+    """
+    items_by_order = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return items_by_order
+
+    rows = db.session.query(
+        OrderItem.order_id,
+        OrderItem.id,
+        OrderItem.menu_id,
+        Menu.name,
+        OrderItem.quantity,
+        OrderItem.price
+    ).outerjoin(Menu, Menu.id == OrderItem.menu_id) \
+     .filter(OrderItem.order_id.in_(order_ids)) \
+     .order_by(OrderItem.order_id, OrderItem.id)
+
+    for order_id, item_id, menu_id, menu_name, quantity, price in rows:
+        items_by_order[order_id].append((item_id, menu_id, menu_name, quantity, price, quantity * price))
+
+    return items_by_order
+
+def order_item_rows(order_ids):
+    """
+    Fetch the items of many orders in one projected query
+
+    Returns:
+        Dict of order id -> list of item dicts in id order
+    """
+    return {
+        order_id: [{
+            'id': item_id,
+            'menu_id': menu_id,
+            'menu_name': menu_name,
+            'quantity': quantity,
+            'price': float(price),
+            'subtotal': float(subtotal)
+        } for item_id, menu_id, menu_name, quantity, price, subtotal in items]
+        for order_id, items in order_item_values(order_ids).items()
+    }
+
+def order_row_to_dict(row, items, fields=None):
+    """Serialize a projected order row the same way Order.to_dict does (items=None omits them)"""
+    data = {
+        'id': row.id,
+        'customer_name': row.customer_name,
+        'status': row.status,
+        'total_amount': float(row.total_amount),
+        'notes': row.notes,
+        'created_at': iso(row.created_at),
+        'updated_at': iso(row.updated_at)
+    }
+    if items is not None:
+        data['order_items'] = list(items)
+    return select_fields(data, fields)
+
+MENU_FIELDS = ('id', 'name', 'description', 'price', 'category', 'image_url', 'image_variants', 'is_available', 'created_at', 'updated_at')
@@ -0,0 +1,354 @@
+from collections import OrderedDict
+from flask import current_app, request, abort
+from werkzeug.security import safe_join
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import MultipartDecoder, File, Data, Epilogue, NeedData
+from werkzeug.utils import send_file
+from PIL import Image
+from app.services.image_pipeline import (
+    UPLOAD_URL_PREFIX, image_pipeline, parse_variant, find_original, variant_filename
+)
+from datetime import datetime, timedelta
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+
+# Uploaded filenames never change content once processed, so browsers and CDNs may keep them
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Provisional responses (an original standing in for a missing variant, or an
+# original still waiting to be processed) are only cached briefly
+PROVISIONAL_CACHE_CONTROL = 'public, max-age=60'
+
+class ETagCache:
+    """
+    Content-hash ETags of uploaded files, memoized by (path, mtime, size)
+
+    Hashing the bytes (instead of werkzeug's mtime-based tag) gives the same strong
+    ETag on every server that holds a copy of the file.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, stat):
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            etag = self._entries.get(key)
+            if etag is not None:
+                self._entries.move_to_end(key)
+                return etag
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        etag = digest.hexdigest()[:32]
+
+        with self._lock:
+            self._entries[key] = etag
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+etag_cache = ETagCache()
+
+def upload_dir():
+    """Absolute directory holding uploaded files"""
+    return current_app.config['UPLOAD_DIR']
+
+# Bytes read from an upload stream at a time
+CHUNK_SIZE = 64 * 1024
+
+# Hex digits of the SHA-256 content hash used as the stored filename
+HASH_LENGTH = 32
+
+# Leading bytes of the accepted image formats -> stored extension
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif')
+)
+SNIFF_BYTES = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+# Stored extension -> format Pillow must identify the file as
+PILLOW_FORMATS = {'jpg': 'JPEG', 'png': 'PNG', 'gif': 'GIF'}
+
+# Originals already known to be processed; they never change again
+_final_originals = set()
+
+def is_final(directory, filename):
+    """Whether a stored upload will never change again"""
+    if filename in _final_originals or parse_variant(filename):
+        return True
+    # Originals are rewritten once, when the pipeline strips their metadata
+    if os.path.exists(os.path.join(directory, variant_filename(filename, 'thumb', 'jpg'))):
+        _final_originals.add(filename)
+        return True
+    return False
+
+def send_upload(filename):
+    """
+    Serve an uploaded file with long-lived caching, strong ETags and Range support
+
+    A variant that has not been written yet is answered with its original (and the
+    original is queued for processing). With UPLOAD_OFFLOAD set, the file body is left
+    to the front-end server via X-Accel-Redirect (nginx) or X-Sendfile (Apache/lighttpd).
+    """
+    directory = upload_dir()
+    path = safe_join(directory, filename)
+    if path is None:
+        abort(404)
+
+    try:
+        stat = os.stat(path)
+        final = is_final(directory, filename)
+    except FileNotFoundError:
+        variant = parse_variant(filename)
+        original = find_original(directory, variant[0]) if variant else None
+        if not original:
+            abort(404)
+        path = os.path.join(directory, original)
+        image_pipeline.submit(path)
+        stat = os.stat(path)
+        filename, final = original, False
+
+    offload = current_app.config.get('UPLOAD_OFFLOAD', '')
+    if offload == 'x-accel':
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = f"{current_app.config['UPLOAD_ACCEL_PREFIX'].rstrip('/')}/{filename}"
+    else:
+        # Conditional and Range requests are answered here even when the body is
+        # left to the front-end server through X-Sendfile
+        response = send_file(
+            path,
+            request.environ,
+            etag=etag_cache.get(path, stat),
+            last_modified=stat.st_mtime,
+            use_x_sendfile=offload == 'x-sendfile',
+            response_class=current_app.response_class,
+            conditional=True
+        )
+        # werkzeug only sets this on range responses; advertise it on full ones too
+        response.headers.setdefault('Accept-Ranges', 'bytes')
+
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if final else PROVISIONAL_CACHE_CONTROL
+    return response
+
+def sniff_image_type(head):
+    """
+    Extension of the image format the leading bytes belong to
+
+    Raises:
+        ValueError: If the bytes are not a PNG, JPEG or GIF image
+    """
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    raise ValueError('File content is not a PNG, JPG or GIF image')
+
+def verify_image(path, ext):
+    """
+    Check that a file parses as the image format its leading bytes claim
+
+    Pillow reads the headers (and for PNG every chunk checksum) without decoding the
+    pixels, which catches a valid signature followed by garbage.
+
+    Raises:
+        ValueError: If Pillow can't parse the file as that format
+    """
+    try:
+        with Image.open(path) as image:
+            if image.format != PILLOW_FORMATS[ext]:
+                raise ValueError(image.format)
+            image.verify()
+    except Exception as e:
+        # Pillow signals corrupt data with SyntaxError, OSError, struct.error and
+        # DecompressionBombError alike
+        raise ValueError('File content is not a valid PNG, JPG or GIF image') from e
+
+def store_upload(chunks, max_bytes=None):
+    """
+    Store uploaded image bytes under their content hash, once
+
+    Chunks are written to a temp file in the upload directory and hashed as they
+    arrive; the format is checked from the first bytes and the size as the data
+    comes in, so bad or oversized uploads are rejected without reading them fully.
+    Complete files must then pass verify_image. The file is then moved to <hash>.<ext>, unless that file already exists, in which
+    case the copy is discarded so identical uploads share one file (and its variants).
+
+    Args:
+        chunks: Iterable of byte strings
+        max_bytes: Size limit, or None for no limit
+
+    Returns:
+        Tuple of (stored filename, True if the bytes were new)
+
+    Raises:
+        ValueError: If the content is not a supported image
+        RequestEntityTooLarge: If the upload exceeds max_bytes
+    """
+    directory = upload_dir()
+    digest = hashlib.sha256()
+    head = b''
+    ext = None
+    size = 0
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as temp:
+            for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise RequestEntityTooLarge(f'Image is larger than {max_bytes} bytes')
+
+                if ext is None:
+                    head += chunk[:SNIFF_BYTES]
+                    if len(head) >= SNIFF_BYTES:
+                        ext = sniff_image_type(head)
+
+                digest.update(chunk)
+                temp.write(chunk)
+
+        if ext is None:
+            ext = sniff_image_type(head)
+        verify_image(temp_path, ext)
+
+        filename = f'{digest.hexdigest()[:HASH_LENGTH]}.{ext}'
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            # Refresh the mtime so a concurrent garbage collection keeps the file
+            os.utime(path)
+            os.remove(temp_path)
+            return filename, False
+
+        os.replace(temp_path, path)
+        return filename, True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def stream_multipart_file(stream, content_type, field, accept_filename):
+    """
+    Read one file field of a multipart/form-data body as it arrives
+
+    Unlike request.files, nothing is buffered or spooled: data is handed on chunk by
+    chunk, and the caller may stop early, leaving the rest of the body unread.
+
+    Args:
+        stream: The request body stream
+        content_type: The request's Content-Type header, with the boundary
+        field: Name of the file field to read
+        accept_filename: Called with the client's filename before any data is read;
+            raises ValueError to reject the upload
+
+    Returns:
+        Iterator of byte chunks of the field's content
+
+    Raises:
+        ValueError: If the body is not multipart or has no such file field
+    """
+    mimetype, options = parse_options_header(content_type)
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        raise ValueError('Expected a multipart/form-data upload')
+
+    # The decoder only holds unparsed bytes (at most a read or two, since data is
+    # handed on as it is parsed); the cap guards against oversized headers and fields
+    decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=4 * CHUNK_SIZE, max_parts=100)
+    events = _multipart_events(decoder, stream)
+
+    for event in events:
+        if isinstance(event, Epilogue):
+            break
+        if isinstance(event, File) and event.name == field:
+            accept_filename(event.filename)
+            return _part_data(events)
+
+    raise ValueError(f'No {field} file provided')
+
+def _multipart_events(decoder, stream):
+    while True:
+        event = decoder.next_event()
+        if isinstance(event, NeedData):
+            chunk = stream.read(CHUNK_SIZE)
+            decoder.receive_data(chunk or None)
+            continue
+        yield event
+        if isinstance(event, Epilogue):
+            return
+
+def _part_data(events):
+    """Yield the data of the current part until it ends"""
+    for event in events:
+        if isinstance(event, Data):
+            if event.data:
+                yield event.data
+            if not event.more_data:
+                return
+        else:
+            return
+
+def referenced_uploads(image_urls):
+    """Filenames of the originals that image URLs point into the upload directory"""
+    return {url[len(UPLOAD_URL_PREFIX):] for url in image_urls
+            if url and url.startswith(UPLOAD_URL_PREFIX)}
+
+def collect_garbage(referenced, grace=timedelta(hours=24), dry_run=False):
+    """
+    Delete uploads that no menu references
+
+    Variants live and die with their original. Files modified within the grace
+    period are kept, since an image is uploaded before the menu that uses it is saved;
+    leftover partial files older than that are removed too.
+
+    Args:
+        referenced: Set of original filenames still in use (see referenced_uploads)
+        grace: Minimum age of a file before it may be deleted
+        dry_run: Only report what would be deleted
+
+    Returns:
+        Dict with counts and byte totals of kept and deleted files
+    """
+    directory = upload_dir()
+    cutoff = (datetime.now() - grace).timestamp()
+    referenced_stems = {os.path.splitext(filename)[0] for filename in referenced}
+    report = {'files': 0, 'bytes': 0, 'deleted_files': 0, 'deleted_bytes': 0, 'dry_run': dry_run}
+
+    for entry in os.scandir(directory):
+        # Hidden files (e.g. .gitkeep) are not uploads
+        if not entry.is_file() or entry.name.startswith('.'):
+            continue
+        stat = entry.stat()
+        report['files'] += 1
+        report['bytes'] += stat.st_size
+
+        variant = parse_variant(entry.name)
+        if entry.name.endswith('.part'):
+            in_use = False
+        elif variant:
+            in_use = variant[0] in referenced_stems
+        else:
+            in_use = entry.name in referenced
+
+        if in_use or stat.st_mtime > cutoff:
+            continue
+
+        if not dry_run:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            _final_originals.discard(entry.name)
+        report['deleted_files'] += 1
+        report['deleted_bytes'] += stat.st_size
+
+    return report
@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for serving the API in production
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+SERVER_MODE selects the worker type:
+- gthread (default): a fixed pool of threads per worker; a slow query or PDF build
+  occupies one thread while the others keep serving. Live order feeds are capped
+  at ORDER_EVENTS_MAX_CLIENTS (default 32) per worker, with a thread reserved for each.
+- gevent (requires gevent): one greenlet per connection. PyMySQL is pure Python, so
+  once gevent patches sockets every DB round trip yields to other requests, and
+  long-lived SSE connections cost a greenlet instead of a thread. CPU-bound work
+  such as PDF rendering blocks the worker's other greenlets while it runs.
+"""
+
+import multiprocessing
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'gthread')
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+# Menu cache, PDF cache and the order event broker are per process. Scale I/O
+# concurrency inside a worker first; extra workers add CPU for PDF rendering, but
+# each one only streams the order events written through itself.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+if server_mode == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+else:
+    worker_class = 'gthread'
+    # Each open order feed (SSE) holds a thread for as long as its page is open, so
+    # streams get slots of their own on top of the request threads; the app answers
+    # streams beyond ORDER_EVENTS_MAX_CLIENTS with 503 instead of starving requests
+    stream_slots = int(os.environ.setdefault('ORDER_EVENTS_MAX_CLIENTS', '32'))
+    threads = int(os.environ.get('THREADS', min(64, multiprocessing.cpu_count() * 8))) + stream_slots
+
+# Only catches hung workers; requests themselves are not time limited
+timeout = int(os.environ.get('TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get('ACCESS_LOG', '-')
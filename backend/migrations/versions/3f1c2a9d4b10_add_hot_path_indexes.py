@@ -0,0 +1,73 @@
+"""add indexes for order and menu list filters
+
+Revision ID: 3f1c2a9d4b10
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d4b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_created_at', ['created_at'], unique=False)
+
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.create_index('ix_menus_category_created_at', ['category', 'created_at'], unique=False)
+        batch_op.create_index('ix_menus_created_at', ['created_at'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_menu_id'), ['menu_id'], unique=False)
+
+
+def _drop_foreign_key_index(table, column, index):
+    """
+    Drop an index that InnoDB may be using to back a foreign key
+
+    Once an explicit index on a foreign key column exists, MySQL is free to drop the
+    index it created for the constraint, and then refuses to drop ours (error 1553).
+    The constraint is dropped around the index and recreated, which makes MySQL create
+    its own backing index again.
+    """
+    foreign_keys = [
+        fk for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)
+        if fk['constrained_columns'] == [column]
+    ]
+    for fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    op.drop_index(index, table_name=table)
+
+    for fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'], fk['constrained_columns'], fk['referred_columns'],
+            **fk.get('options', {})
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        _drop_foreign_key_index('order_items', 'menu_id', 'ix_order_items_menu_id')
+        _drop_foreign_key_index('order_items', 'order_id', 'ix_order_items_order_id')
+    else:
+        with op.batch_alter_table('order_items', schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f('ix_order_items_menu_id'))
+            batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('menus', schema=None) as batch_op:
+        batch_op.drop_index('ix_menus_created_at')
+        batch_op.drop_index('ix_menus_category_created_at')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_created_at')
+        batch_op.drop_index('ix_orders_status_created_at')
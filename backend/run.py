@@ -2,6 +2,9 @@ from app import create_app, db
 from app.models.admin import Admin
 from app.models.menu import Menu
 from app.models.order import Order, OrderItem
+from app.services.uploads import referenced_uploads, collect_garbage
+from datetime import timedelta
+import click
 
 app = create_app()
 
@@ -36,5 +39,17 @@ def init_db():
     db.session.commit()
     print('Database initialized successfully!')
 
+@app.cli.command('gc-uploads')
+@click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+@click.option('--grace-hours', default=24, show_default=True, help='Keep files modified more recently than this.')
+def gc_uploads(dry_run, grace_hours):
+    """Delete uploaded images (and their variants) that no menu references."""
+    referenced = referenced_uploads(url for url, in db.session.query(Menu.image_url).distinct())
+    report = collect_garbage(referenced, timedelta(hours=grace_hours), dry_run)
+    
+    action = 'Would delete' if dry_run else 'Deleted'
+    print(f"{action} {report['deleted_files']} of {report['files']} files, "
+          f"reclaiming {report['deleted_bytes'] / 1024 / 1024:.1f} MB of {report['bytes'] / 1024 / 1024:.1f} MB")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+# Config reads the environment at import time. TEST_DATABASE_URL points the suite at a
+# real server (e.g. a throwaway MySQL database); the default is in-memory SQLite.
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+# Menu writes refresh the catalog themselves; no background version checks in tests
+os.environ.setdefault('MENU_CACHE_CHECK_SECONDS', '3600')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.admin import Admin
+from app.models.menu import Menu
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Test client logged in as an admin"""
+    admin = Admin(username='admin')
+    admin.set_password('secret')
+    db.session.add(admin)
+    db.session.commit()
+
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'secret'})
+    assert response.status_code == 200
+    return client
+
+@pytest.fixture
+def menus(app):
+    """A small catalog across two categories"""
+    menus = [
+        Menu(name=f'Menu {i}', description='', price=1000 + i, category='Main' if i % 2 else 'Drink')
+        for i in range(10)
+    ]
+    db.session.add_all(menus)
+    db.session.commit()
+    return menus
+
+class QueryCounter:
+    """Records the SQL statements (with their driver parameters) an engine executes while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager factory counting the statements run inside it"""
+    return lambda: QueryCounter(db.engine)
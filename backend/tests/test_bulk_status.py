@@ -0,0 +1,24 @@
+"""PUT /api/orders/status rejects filters it can't turn into a cutoff with a 400"""
+import pytest
+
+def bulk_update(client, criteria):
+    return client.put('/api/orders/status', json={'status': 'completed', 'filter': criteria})
+
+@pytest.mark.parametrize('minutes', [1e300, -5, 'inf', 'nan', 'soon', True])
+def test_out_of_range_age_is_rejected(client, minutes):
+    response = bulk_update(client, {'status': 'pending', 'older_than_minutes': minutes})
+
+    assert response.status_code == 400
+    assert 'older_than_minutes' in response.get_json()['error']
+
+def test_unrepresentable_created_before_is_rejected(client):
+    response = bulk_update(client, {'created_before': '0001-01-01T00:00:00+14:00'})
+
+    assert response.status_code == 400
+
+def test_age_filter_applies(client, menus):
+    response = client.post('/api/orders', json={'customer_name': 'A', 'items': [{'menu_id': menus[0].id, 'quantity': 1}]})
+    order_id = response.get_json()['order']['id']
+
+    assert bulk_update(client, {'older_than_minutes': 60}).get_json()['updated'] == []
+    assert bulk_update(client, {'older_than_minutes': 0}).get_json()['updated'] == [order_id]
@@ -0,0 +1,54 @@
+"""Export jobs always end as completed or failed, even when their worker never finishes them"""
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.export_job import ExportJob
+from app.services.export_jobs import export_jobs
+
+def add_job(status='queued', minutes_ago=0):
+    stamp = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    job = ExportJob(kind='orders_pdf', params={}, filename='report.pdf', status=status,
+                    created_at=stamp, updated_at=stamp)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+def status_of(job_id):
+    db.session.expire_all()
+    return db.session.get(ExportJob, job_id).status
+
+def test_job_orphaned_by_a_restart_fails_when_polled(client):
+    job_id = add_job('running', minutes_ago=60)
+
+    job = client.get(f'/api/orders/export-jobs/{job_id}').get_json()['job']
+
+    assert job['status'] == 'failed'
+    assert 'did not finish' in job['error']
+
+def test_purge_fails_only_stale_jobs(app):
+    stale = [add_job('queued', minutes_ago=60), add_job('running', minutes_ago=60)]
+    recent = add_job('running', minutes_ago=1)
+
+    export_jobs.purge_expired()
+
+    assert [status_of(job_id) for job_id in stale] == ['failed', 'failed']
+    assert status_of(recent) == 'running'
+
+def test_render_error_fails_the_job(app):
+    job_id = add_job()
+
+    def render(params, output):
+        raise RuntimeError('boom')
+    export_jobs._run(app, job_id, render)
+
+    assert status_of(job_id) == 'failed'
+    assert db.session.get(ExportJob, job_id).error == 'boom'
+
+def test_job_failed_while_queued_is_not_run(app):
+    job_id = add_job('failed')
+    rendered = []
+
+    export_jobs._run(app, job_id, lambda params, output: rendered.append(params))
+
+    assert rendered == []
+    assert status_of(job_id) == 'failed'
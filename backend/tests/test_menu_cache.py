@@ -0,0 +1,51 @@
+"""The menu catalog cache never prices or validates orders from an outdated catalog"""
+from app import db
+from app.models.cache_version import CacheVersion
+from app.models.menu import Menu
+from app.models.order import OrderItem
+from app.services.menu_cache import menu_cache
+
+def write_from_another_worker(change):
+    """Change menus the way another process would: commit and bump the version, no refresh here"""
+    change()
+    CacheVersion.bump(menu_cache.VERSION_KEY)
+    db.session.commit()
+
+def test_order_uses_price_changed_by_another_worker(client, menus):
+    menu_id = menus[0].id
+    menu_cache.snapshot()  # warm, and well inside the check interval from here on
+    write_from_another_worker(lambda: Menu.query.filter_by(id=menu_id).update({'price': 5000}))
+
+    response = client.post('/api/orders', json={'customer_name': 'A', 'items': [{'menu_id': menu_id, 'quantity': 1}]})
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['order']['total_amount'] == 5000
+    assert db.session.query(OrderItem.price).scalar() == 5000
+
+def test_order_for_menu_deleted_by_another_worker_is_rejected(client, menus):
+    menu_id = menus[0].id
+    menu_cache.snapshot()
+    write_from_another_worker(lambda: Menu.query.filter_by(id=menu_id).delete())
+
+    response = client.post('/api/orders', json={'customer_name': 'A', 'items': [{'menu_id': menu_id, 'quantity': 1}]})
+
+    assert response.status_code == 400
+    assert 'not found' in response.get_json()['error']
+
+def test_menu_detail_is_checked_against_the_shared_version(client, menus):
+    menu_id = menus[0].id
+    menu_cache.snapshot()
+    write_from_another_worker(lambda: Menu.query.filter_by(id=menu_id).update({'name': 'Renamed'}))
+
+    response = client.get(f'/api/menus/{menu_id}')
+
+    assert response.get_json()['menu']['name'] == 'Renamed'
+
+def test_lists_pick_up_changes_once_the_interval_passes(client, menus, monkeypatch):
+    menu_cache.snapshot()
+    write_from_another_worker(lambda: Menu.query.filter_by(id=menus[0].id).update({'name': 'Renamed'}))
+    monkeypatch.setattr(menu_cache, 'check_interval', 0)
+
+    names = [menu['name'] for menu in client.get('/api/menus?per_page=100').get_json()['menus']]
+
+    assert 'Renamed' in names
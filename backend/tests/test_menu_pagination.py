@@ -0,0 +1,56 @@
+"""Cursor pages of menu search results come from the cached catalog, in cursor order"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.menu import Menu
+
+def walk(client, url):
+    """Ids of every page following next_cursor, then of every page back via prev_cursor"""
+    forward, pages, cursor = [], [], ''
+    while cursor is not None:
+        data = client.get(f'{url}&cursor={cursor}').get_json()
+        pages.append([menu['id'] for menu in data['menus']])
+        forward += pages[-1]
+        cursor = data['next_cursor']
+        last = data
+    backward, cursor = [], last['prev_cursor']
+    while cursor is not None:
+        data = client.get(f'{url}&cursor={cursor}').get_json()
+        backward = [menu['id'] for menu in data['menus']] + backward
+        cursor = data['prev_cursor']
+    return forward, backward + pages[-1]
+
+@pytest.fixture
+def catalog(app):
+    """Matching and non-matching menus, some sharing a created_at"""
+    start = datetime(2026, 1, 1)
+    menus = [
+        Menu(name=f'{"Satay" if i % 3 else "Tea"} {i}', description='', price=1000, category='Main',
+             created_at=start + timedelta(hours=i // 2))
+        for i in range(40)
+    ]
+    db.session.add_all(menus)
+    db.session.commit()
+    return menus
+
+@pytest.mark.parametrize('per_page', [1, 4, 7, 100])
+def test_search_pages_cover_all_matches_newest_first(client, catalog, count_queries, per_page):
+    expected = [menu.id for menu in sorted(catalog, key=lambda menu: (menu.created_at, menu.id), reverse=True)
+                if menu.name.startswith('Satay')]
+
+    with count_queries() as counter:
+        forward, backward = walk(client, f'/api/menus?search=satay&per_page={per_page}')
+
+    assert forward == expected
+    assert backward == expected
+    assert not any(' IN ' in statement for statement in counter.statements)
+
+def test_search_cursor_mode_reports_total(client, catalog):
+    data = client.get('/api/menus?search=satay&cursor=&include_total=1').get_json()
+
+    assert data['total'] == 26
+
+def test_search_cursor_mode_rejects_invalid_cursor(client, catalog):
+    assert client.get('/api/menus?search=satay&cursor=garbage').status_code == 400
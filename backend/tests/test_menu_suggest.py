@@ -0,0 +1,82 @@
+"""MenuSuggestIndex ranking, typo tolerance and its per-query work caps"""
+from types import SimpleNamespace
+import random
+
+from app import db
+from app.models.menu import Menu
+from app.services.menu_search import EXACT_MATCH, PREFIX_MATCH, MenuSuggestIndex, tokenize
+
+def catalog(names, unavailable=()):
+    """Menus newest first, like the catalog cache passes them"""
+    return [SimpleNamespace(id=i, name=name, is_available=i not in unavailable) for i, name in enumerate(names)]
+
+def names(menus):
+    return [menu.name for menu in menus]
+
+def brute_force(menus, query, limit):
+    """Exact and prefix matching by scoring every menu"""
+    terms = tokenize(query)
+    scored = []
+    for position, menu in enumerate(menus):
+        tokens = tokenize(menu.name)
+        score = 0
+        for index, term in enumerate(terms):
+            best = max((EXACT_MATCH if token == term else
+                        PREFIX_MATCH if index == len(terms) - 1 and token.startswith(term) else 0
+                        for token in tokens), default=0)
+            if not best:
+                break
+            score += best
+        else:
+            scored.append((-score, len(menu.name), position, menu.name))
+    return [name for *_, name in sorted(scored)[:limit]]
+
+def test_prefix_and_typos():
+    index = MenuSuggestIndex(catalog(['Nasi Goreng', 'Nasi Uduk', 'Rendang', 'Es Teh Manis', 'Mie Goreng']))
+
+    assert names(index.suggest('nasi g')) == ['Nasi Goreng']
+    assert names(index.suggest('nasi gorneg')) == ['Nasi Goreng']
+    assert names(index.suggest('redang')) == ['Rendang']
+    assert names(index.suggest('es teh man')) == ['Es Teh Manis']
+    assert names(index.suggest('goreng')) == ['Mie Goreng', 'Nasi Goreng']
+    assert index.suggest('xyz') == []
+    assert index.suggest('') == []
+
+def test_exact_beats_prefix_beats_typo():
+    index = MenuSuggestIndex(catalog(['Sate Kambing', 'Sate', 'Soto', 'Satay Special']))
+
+    assert names(index.suggest('sate')) == ['Sate', 'Sate Kambing', 'Satay Special']
+    assert names(index.suggest('sate', limit=2)) == ['Sate', 'Sate Kambing']
+    assert names(index.suggest('sat')) == ['Sate', 'Sate Kambing', 'Satay Special']
+
+def test_available_only_and_limit():
+    index = MenuSuggestIndex(catalog(['Es Teh', 'Es Jeruk', 'Es Kopi', 'Es Campur'], unavailable={1}))
+
+    assert names(index.suggest('es', limit=2)) == ['Es Teh', 'Es Kopi']
+    assert 'Es Jeruk' not in names(index.suggest('es', available_only=True))
+
+def test_matches_scoring_every_menu_past_the_caps():
+    rnd = random.Random(1)
+    words = ['nasi', 'mie', 'ayam', 'bakar', 'goreng', 'sate', 'soto', 'es', 'teh', 'kopi']
+    fragments = [''.join(rnd.choice('bkmnrst') + rnd.choice('aiu') for _ in range(3)) for _ in range(400)]
+    menus = catalog([' '.join(rnd.sample(words, 2) + [rnd.choice(fragments)]) for _ in range(5000)])
+    index = MenuSuggestIndex(menus)
+
+    # Short prefixes expand to more tokens than MAX_EXPANSIONS and common words have
+    # more postings than MAX_FILTER_POSTINGS allows to intersect
+    for query in ['n', 'b', 'ka', 'nasi', 'nasi b', 'ayam ba', 'es teh', 'kopi sate m', 'goreng ma']:
+        assert names(index.suggest(query, limit=10)) == brute_force(menus, query, 10), query
+
+def test_suggest_endpoint(client):
+    db.session.add_all([
+        Menu(name='Nasi Goreng', price=25000, category='Main'),
+        Menu(name='Nasi Uduk', price=20000, category='Main', is_available=False)
+    ])
+    db.session.commit()
+
+    response = client.get('/api/menus/suggest?q=nasi+gorneg')
+    assert response.status_code == 200
+    assert [menu['name'] for menu in response.get_json()['suggestions']] == ['Nasi Goreng']
+
+    response = client.get('/api/menus/suggest?q=nasi&available=1')
+    assert [menu['name'] for menu in response.get_json()['suggestions']] == ['Nasi Goreng']
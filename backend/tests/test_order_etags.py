@@ -0,0 +1,49 @@
+"""Order validators come from versions, so a 304 never loads the payload it stands for"""
+import pytest
+
+def create_order(client, menu_id, quantity=1):
+    response = client.post('/api/orders', json={'customer_name': 'A', 'items': [{'menu_id': menu_id, 'quantity': quantity}]})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['order']['id']
+
+def revalidate(client, url, count_queries):
+    etag = client.get(url).headers['ETag']
+    with count_queries() as counter:
+        response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    return counter.statements
+
+@pytest.mark.parametrize('url', ['/api/orders', '/api/orders?cursor=', '/api/orders?cursor=&include_total=1'])
+def test_list_304_runs_only_the_aggregate(client, menus, count_queries, url):
+    create_order(client, menus[0].id)
+
+    statements = revalidate(client, url, count_queries)
+
+    assert not any('order_items' in statement for statement in statements)
+    assert not any('LIMIT' in statement for statement in statements)
+
+def test_detail_304_loads_no_items(client, menus, count_queries):
+    order_id = create_order(client, menus[0].id)
+
+    statements = revalidate(client, f'/api/orders/{order_id}', count_queries)
+
+    assert not any('order_items' in statement for statement in statements)
+
+@pytest.mark.parametrize('change', [
+    lambda client, order_id, menus: client.put(f'/api/orders/{order_id}', json={'items': [{'menu_id': menus[1].id, 'quantity': 1}]}),
+    lambda client, order_id, menus: client.put(f'/api/orders/{order_id}/status', json={'status': 'completed'}),
+    lambda client, order_id, menus: client.put('/api/orders/status', json={'status': 'completed', 'ids': [order_id]}),
+    lambda client, order_id, menus: client.put(f'/api/menus/{menus[0].id}', json={'name': 'Renamed'}),
+])
+def test_etags_change_with_the_order(client, menus, change):
+    order_id = create_order(client, menus[0].id)
+    urls = [f'/api/orders/{order_id}', '/api/orders', '/api/orders?cursor=']
+    before = [client.get(url).headers['ETag'] for url in urls]
+
+    assert change(client, order_id, menus).status_code == 200
+
+    after = [client.get(url).headers['ETag'] for url in urls]
+    assert all(old != new for old, new in zip(before, after))
+
+def test_invalid_cursor_is_rejected(client, menus):
+    assert client.get('/api/orders?cursor=garbage').status_code == 400
@@ -0,0 +1,59 @@
+"""A page of orders costs a constant number of SQL statements, however many orders and items it holds"""
+import pytest
+
+from app import db
+from app.models.menu import Menu
+from app.models.order import Order, OrderItem
+
+def add_orders(count, items_per_order=3):
+    menus = Menu.query.order_by(Menu.id).all()
+    orders = [Order(customer_name=f'Customer {i}', status='pending', total_amount=0) for i in range(count)]
+    db.session.add_all(orders)
+    db.session.flush()
+    for i, order in enumerate(orders):
+        for j in range(items_per_order):
+            menu = menus[(i + j) % len(menus)]
+            db.session.add(OrderItem(order_id=order.id, menu_id=menu.id, quantity=j + 1, price=menu.price))
+    db.session.commit()
+    return [order.id for order in orders]
+
+def statements_for(client, count_queries, url):
+    # Sessions are per request; start from a clean identity map like a real request
+    db.session.remove()
+    with count_queries() as queries:
+        response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return queries.count
+
+@pytest.mark.parametrize('url', [
+    '/api/orders?per_page=100',
+    '/api/orders?per_page=100&status=pending',
+    '/api/orders?per_page=100&cursor=',
+    '/api/orders?format=ndjson',
+    '/api/orders/export?format=csv',
+    '/api/orders/export?format=ndjson&rows=orders',
+])
+def test_order_listing_statement_count_is_constant(client, menus, count_queries, url):
+    add_orders(5)
+    small = statements_for(client, count_queries, url)
+
+    add_orders(95)
+    large = statements_for(client, count_queries, url)
+
+    assert large == small
+
+def test_order_detail_statement_count_does_not_grow_with_items(client, menus, count_queries):
+    small_order, large_order = add_orders(1, 2)[0], add_orders(1, 10)[0]
+
+    small = statements_for(client, count_queries, f'/api/orders/{small_order}')
+    large = statements_for(client, count_queries, f'/api/orders/{large_order}')
+
+    assert large == small
+
+def test_order_list_includes_menu_names(client, menus):
+    add_orders(2)
+
+    orders = client.get('/api/orders').get_json()['orders']
+
+    assert {item['menu_name'] for order in orders for item in order['order_items']} <= {f'Menu {i}' for i in range(10)}
+    assert all(len(order['order_items']) == 3 for order in orders)
@@ -0,0 +1,30 @@
+"""Cache key of the bulk orders report changes whenever the report's contents can"""
+from app.routes.orders import orders_report_cache_key
+
+def create_order(client, menu_id, quantity=1):
+    response = client.post('/api/orders', json={'customer_name': 'A', 'items': [{'menu_id': menu_id, 'quantity': quantity}]})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['order']['id']
+
+def test_key_changes_when_the_newest_order_is_replaced(client, menus):
+    create_order(client, menus[0].id)
+    newest = create_order(client, menus[0].id)
+    before = orders_report_cache_key()
+
+    assert client.delete(f'/api/orders/{newest}').status_code == 200
+    replacement = create_order(client, menus[1].id)
+
+    # Count, max(id) and the version sum can all come back to the same values
+    # when the id is reused (SQLite without AUTOINCREMENT)
+    assert orders_report_cache_key() != before
+    if replacement == newest:
+        assert orders_report_cache_key()[2:5] == before[2:5]
+
+def test_key_changes_on_item_edits(client, menus):
+    order_id = create_order(client, menus[0].id)
+    before = orders_report_cache_key()
+
+    response = client.put(f'/api/orders/{order_id}', json={'items': [{'menu_id': menus[1].id, 'quantity': 1}]})
+
+    assert response.status_code == 200
+    assert orders_report_cache_key() != before
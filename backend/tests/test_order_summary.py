@@ -0,0 +1,42 @@
+"""Dashboard summary: today's revenue counts from local midnight"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.order import Order
+
+def local_midnight_utc(offset_minutes):
+    """Naive UTC time of the most recent local midnight at this offset"""
+    offset = timedelta(minutes=offset_minutes)
+    return (datetime.utcnow() + offset).replace(hour=0, minute=0, second=0, microsecond=0) - offset
+
+def add_completed_orders(*created_ats):
+    db.session.add_all(
+        Order(customer_name=f'Customer {i}', status='completed', total_amount=1000 * (i + 1), created_at=created_at)
+        for i, created_at in enumerate(created_ats)
+    )
+    db.session.commit()
+
+def today_revenue(client, **params):
+    response = client.get('/api/orders/summary', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['summary']['today_revenue']
+
+@pytest.mark.parametrize('offset', [7 * 60, 0, -5 * 60, 14 * 60])
+def test_today_starts_at_local_midnight(client, offset):
+    midnight = local_midnight_utc(offset)
+    # One order at local midnight, one a second before it
+    add_completed_orders(midnight, midnight - timedelta(seconds=1))
+
+    assert today_revenue(client, tz_offset=offset) == 1000
+
+def test_default_offset_comes_from_config(app, client):
+    midnight = local_midnight_utc(app.config['TIMEZONE_OFFSET_MINUTES'])
+    add_completed_orders(midnight, midnight - timedelta(seconds=1))
+
+    assert today_revenue(client) == 1000
+
+def test_rejects_out_of_range_offset(client):
+    response = client.get('/api/orders/summary?tz_offset=900')
+    assert response.status_code == 400
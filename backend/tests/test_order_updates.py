@@ -0,0 +1,137 @@
+"""PUT /api/orders/<id> applies item changes as a diff against the existing rows"""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import os
+
+import pytest
+
+from app import db
+from app.models.menu import Menu
+from app.models.order import Order, OrderItem
+
+def create_order(client, lines):
+    response = client.post('/api/orders', json={
+        'customer_name': 'Table 1',
+        'items': [{'menu_id': menu_id, 'quantity': quantity} for menu_id, quantity in lines]
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['order']
+
+def update_items(client, order_id, lines):
+    response = client.put(f'/api/orders/{order_id}', json={
+        'items': [{'menu_id': menu_id, 'quantity': quantity} for menu_id, quantity in lines]
+    })
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['order']
+
+def stored_items(order_id):
+    """(id, menu_id, quantity, price) of an order's rows, read fresh from the database"""
+    db.session.remove()
+    return [
+        (item.id, item.menu_id, item.quantity, item.price)
+        for item in OrderItem.query.filter_by(order_id=order_id).order_by(OrderItem.id)
+    ]
+
+def assert_total_matches_items(order_id):
+    items = stored_items(order_id)
+    order = db.session.get(Order, order_id)
+    assert order.total_amount == sum((quantity * price for _, _, quantity, price in items), Decimal('0'))
+
+@pytest.fixture
+def menu_ids(menus):
+    return [menu.id for menu in menus]
+
+def test_unchanged_and_requantified_items_keep_their_ids(client, menu_ids):
+    a, b, c, d = menu_ids[:4]
+    order = create_order(client, [(a, 1), (b, 2), (c, 3)])
+    ids = {item['menu_id']: item['id'] for item in order['order_items']}
+
+    updated = update_items(client, order['id'], [(a, 1), (b, 5), (d, 1)])
+
+    after = {item['menu_id']: item['id'] for item in updated['order_items']}
+    assert after[a] == ids[a]
+    assert after[b] == ids[b]
+    assert c not in after
+    assert after[d] not in ids.values()
+    assert_total_matches_items(order['id'])
+
+def test_total_is_correct_with_duplicate_menu_lines(client, menu_ids):
+    a, b = menu_ids[:2]
+    order = create_order(client, [(a, 1), (a, 2), (b, 1)])
+
+    updated = update_items(client, order['id'], [(a, 2), (a, 5), (a, 1), (b, 3)])
+
+    quantities = sorted(item['quantity'] for item in updated['order_items'] if item['menu_id'] == a)
+    assert quantities == [1, 2, 5]
+    assert_total_matches_items(order['id'])
+
+    updated = update_items(client, order['id'], [(a, 4)])
+
+    assert [(item['menu_id'], item['quantity']) for item in updated['order_items']] == [(a, 4)]
+    assert_total_matches_items(order['id'])
+
+def test_removing_every_item_empties_the_order(client, menu_ids):
+    order = create_order(client, [(menu_ids[0], 2), (menu_ids[1], 1)])
+
+    updated = update_items(client, order['id'], [])
+
+    assert updated['order_items'] == []
+    assert updated['total_amount'] == 0
+    assert stored_items(order['id']) == []
+
+def test_matched_items_keep_their_original_price(client, menu_ids):
+    order = create_order(client, [(menu_ids[0], 1)])
+    menu = db.session.get(Menu, menu_ids[0])
+    old_price = menu.price
+    client.put(f'/api/menus/{menu.id}', json={'price': float(old_price) * 2})
+
+    update_items(client, order['id'], [(menu_ids[0], 3)])
+
+    [(_, _, quantity, price)] = stored_items(order['id'])
+    assert (quantity, price) == (3, old_price)
+    assert_total_matches_items(order['id'])
+
+def test_large_order_only_touches_changed_rows(client, menu_ids, count_queries):
+    lines = [(menu_ids[i % len(menu_ids)], 1) for i in range(300)]
+    order = create_order(client, lines)
+    before = stored_items(order['id'])
+
+    changed = list(lines)
+    changed[150] = (changed[150][0], 7)
+    with count_queries() as queries:
+        update_items(client, order['id'], changed)
+
+    writes = [statement for statement in queries.statements
+              if 'order_items' in statement and statement.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+    assert len(writes) == 1 and writes[0].lstrip().upper().startswith('UPDATE')
+
+    after = stored_items(order['id'])
+    assert [row[0] for row in after] == [row[0] for row in before]
+    assert sum(row[2] for row in after) == 306
+    assert_total_matches_items(order['id'])
+
+@pytest.mark.skipif(
+    not os.environ.get('TEST_DATABASE_URL', '').startswith('mysql'),
+    reason='SELECT ... FOR UPDATE needs a server with row locks (set TEST_DATABASE_URL to MySQL)'
+)
+def test_concurrent_edits_are_applied_one_at_a_time(app, client, menu_ids):
+    a, b, c = menu_ids[:3]
+    order = create_order(client, [(a, 1)])
+    payloads = [[(a, 2), (b, 1)], [(b, 3), (c, 1)], [(a, 1), (c, 2)], [(a, 1), (b, 1), (c, 1)]]
+
+    def edit(payload):
+        worker = app.test_client()
+        worker.post('/api/auth/login', json={'username': 'admin', 'password': 'secret'})
+        for _ in range(10):
+            response = worker.put(f'/api/orders/{order["id"]}', json={
+                'items': [{'menu_id': menu_id, 'quantity': quantity} for menu_id, quantity in payload]
+            })
+            assert response.status_code == 200, response.get_json()
+
+    with ThreadPoolExecutor(len(payloads)) as pool:
+        list(pool.map(edit, payloads))
+
+    # Whatever edit came last, the rows are exactly one payload and the total matches them
+    items = sorted((menu_id, quantity) for _, menu_id, quantity, _ in stored_items(order['id']))
+    assert items in [sorted(payload) for payload in payloads]
+    assert_total_matches_items(order['id'])
@@ -0,0 +1,40 @@
+"""POST /api/menus/upload-image only stores files Pillow can parse as images"""
+import io
+import os
+
+import pytest
+from PIL import Image
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (16, 16), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config['UPLOAD_DIR'] = str(tmp_path)
+    return tmp_path
+
+def upload(client, data, filename='photo.png'):
+    return client.post('/api/menus/upload-image', data={'image': (io.BytesIO(data), filename)},
+                       content_type='multipart/form-data')
+
+def test_valid_image_is_stored(client, upload_dir):
+    response = upload(client, png_bytes())
+
+    assert response.status_code == 200, response.get_json()
+    filename = response.get_json()['image_url'].rsplit('/', 1)[1]
+    assert (upload_dir / filename).exists()
+
+@pytest.mark.parametrize('data', [
+    b'\x89PNG\r\n\x1a\n' + os.urandom(4096),
+    b'GIF89a' + os.urandom(4096),
+    b'\xff\xd8\xff' + os.urandom(4096),
+    png_bytes()[:60],
+])
+def test_signature_followed_by_garbage_is_rejected(client, upload_dir, data):
+    response = upload(client, data)
+
+    assert response.status_code == 400
+    assert 'not a valid' in response.get_json()['error']
+    assert list(upload_dir.iterdir()) == []
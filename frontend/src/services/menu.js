@@ -19,6 +19,15 @@ class MenuService {
     }
   }
 
+  async suggestMenus(q, params = {}) {
+    try {
+      const response = await api.get('/menus/suggest', { params: { q, ...params } })
+      return response.data.suggestions
+    } catch (error) {
+      throw error.response?.data || { error: 'Failed to suggest menus' }
+    }
+  }
+
   async createMenu(menuData) {
     try {
       const response = await api.post('/menus', menuData)
@@ -1,5 +1,9 @@
 import api from './api'
 
+// Polling of background export jobs: interval, and how long to wait before giving up
+const EXPORT_POLL_INTERVAL_MS = 1000
+const EXPORT_POLL_TIMEOUT_MS = 5 * 60 * 1000
+
 class OrderService {
   async getOrders(params = {}) {
     try {
@@ -10,6 +14,15 @@ class OrderService {
     }
   }
 
+  async getSummary(params = {}) {
+    try {
+      const response = await api.get('/orders/summary', { params })
+      return response.data.summary
+    } catch (error) {
+      throw error.response?.data || { error: 'Failed to fetch order summary' }
+    }
+  }
+
   async getOrder(id) {
     try {
       const response = await api.get(`/orders/${id}`)
@@ -46,6 +59,15 @@ class OrderService {
     }
   }
 
+  async bulkUpdateOrderStatus(status, { ids, filter } = {}) {
+    try {
+      const response = await api.put('/orders/status', ids ? { status, ids } : { status, filter })
+      return response.data
+    } catch (error) {
+      throw error.response?.data || { error: 'Failed to update order status' }
+    }
+  }
+
   async deleteOrder(id) {
     try {
       const response = await api.delete(`/orders/${id}`)
@@ -57,8 +79,22 @@ class OrderService {
 
   async exportOrdersPDF(params = {}) {
     try {
-      const response = await api.get('/orders/export-pdf', { 
-        params,
+      // Render the report in a background job and poll until it is ready
+      let { data: { job } } = await api.post('/orders/export-jobs', params)
+      const deadline = Date.now() + EXPORT_POLL_TIMEOUT_MS
+      while (job.status === 'queued' || job.status === 'running') {
+        if (Date.now() >= deadline) {
+          throw { error: 'Failed to export orders PDF', details: 'The export is taking too long, please try again later' }
+        }
+        await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS))
+        job = (await api.get(`/orders/export-jobs/${job.id}`)).data.job
+      }
+
+      if (job.status === 'failed') {
+        throw { error: 'Failed to export orders PDF', details: job.error }
+      }
+
+      const response = await api.get(`/orders/export-jobs/${job.id}/download`, {
         responseType: 'blob' // Important for file downloads
       })
       
@@ -85,7 +121,7 @@ class OrderService {
       
       return { success: true, message: 'PDF exported successfully' }
     } catch (error) {
-      throw error.response?.data || { error: 'Failed to export orders PDF' }
+      throw error.response?.data || (error.error ? error : { error: 'Failed to export orders PDF' })
     }
   }
 
@@ -120,6 +156,44 @@ class OrderService {
       throw error.response?.data || { error: 'Failed to export order PDF' }
     }
   }
+
+  // Live order changes over Server-Sent Events; the browser reconnects and resumes
+  // from the last event id on its own. When the server turns the stream away (e.g. 503
+  // while its feed slots are full) the browser gives up, so retry later and resync.
+  // Returns an object with close() to stop listening.
+  subscribe(onChange, retryMs = 30000) {
+    const events = ['created', 'updated', 'deleted', 'status_changed', 'resync']
+    let source = null
+    let retryTimer = null
+
+    const connect = () => {
+      source = new EventSource(`${api.defaults.baseURL}/orders/stream`, { withCredentials: true })
+
+      events.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          onChange(type, JSON.parse(event.data))
+        })
+      })
+
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          retryTimer = setTimeout(() => {
+            connect()
+            onChange('resync', {})
+          }, retryMs)
+        }
+      }
+    }
+
+    connect()
+
+    return {
+      close() {
+        clearTimeout(retryTimer)
+        source.close()
+      }
+    }
+  }
 }
 
 export const orderService = new OrderService()
\ No newline at end of file